@@ -0,0 +1,85 @@
+"""Offline benchmark of the HTML parser backends on the saved pages in fixtures/pages.
+
+For every page, times html.parser against lxml (when installed) for the full parse + extraction
+and for the partial parse (head metadata and selected scripts only, via SoupStrainer), and
+asserts that every backend extracts exactly the same fields.
+
+Usage: python bench_html_parsing.py [repeats]
+"""
+import io
+import os
+import sys
+import time
+import contextlib
+
+os.environ.setdefault("TRANSCRIPT_ENABLED", "0")  # no caption downloads from the partial YouTube path
+
+import html_parsing
+from html_parsing import make_soup, make_partial_soup, AVAILABLE_PARSERS
+from metadata import head_meta
+from utils import extract_youtube_content, extract_youtube_content_partial, extract_general_website_content
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+# fixture file -> (URL it was saved from, content type it is parsed as)
+PAGES = {
+    'youtube_watch.html': ('https://www.youtube.com/watch?v=gvyUuxdRdR4', 'youtube'),
+    'news_article.html': ('https://cityherald.example/news/council-transit-budget', 'website'),
+    'spotify_track.html': ('https://open.spotify.com/track/6VBhH7CyP56BXjp8VsDFPZ', 'metadata'),
+}
+
+
+def full_parse(markup, url, content_type):
+    soup = make_soup(markup, content_type)
+    if content_type == 'youtube':
+        return extract_youtube_content(soup, url)
+    if content_type == 'website':
+        return extract_general_website_content(soup, url)
+    return head_meta(soup)
+
+
+def partial_parse(markup, url, content_type):
+    if content_type == 'youtube':
+        return extract_youtube_content_partial(markup, url)
+    return head_meta(make_partial_soup(markup, content_type))
+
+
+def fields(data):
+    """Extracted fields without the per-call timestamp"""
+    return {key: value for key, value in (data or {}).items() if key != 'extracted_at'}
+
+
+def timed(func, markup, url, content_type, repeats):
+    with contextlib.redirect_stdout(io.StringIO()):  # the extractors log every call
+        started = time.perf_counter()
+        for _ in range(repeats):
+            result = func(markup, url, content_type)
+        elapsed = time.perf_counter() - started
+    return elapsed / repeats * 1000, fields(result)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    parsers = [p for p in ('html.parser', 'lxml') if p in AVAILABLE_PARSERS]
+    print(f"parsers: {', '.join(parsers)}; {repeats} repeats per measurement\n")
+    for name, (url, content_type) in PAGES.items():
+        with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+            markup = f.read()
+        results = {}
+        for mode, func in (('full', full_parse), ('partial', partial_parse)):
+            timings = []
+            for parser in parsers:
+                html_parsing.HTML_PARSERS[content_type] = parser
+                ms, extracted = timed(func, markup, url, content_type, repeats)
+                assert extracted, (name, mode, parser, "nothing extracted")
+                results.setdefault(mode, {})[parser] = extracted
+                timings.append(f"{parser} {ms:.2f} ms")
+            reference = results[mode][parsers[0]]
+            for parser in parsers[1:]:
+                assert results[mode][parser] == reference, (name, mode, parser, results[mode][parser], reference)
+            print(f"{name} ({len(markup) // 1024} KB) {mode:>7}: {' | '.join(timings)}")
+        print(f"  {len(results['full'][parsers[0]])} fields, identical across parsers\n")
+
+
+if __name__ == '__main__':
+    main()
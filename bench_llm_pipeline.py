@@ -0,0 +1,76 @@
+"""Load test of the summary pipeline against the local stub LLM provider (no network, no quota).
+
+Runs `requests` website summaries through create_website_summary_response_async with at most
+`concurrency` in flight, and reports throughput and latency percentiles. Stub behaviour is set
+with the LLM_STUB_* variables; the summary cache is off unless SUMMARY_CACHE_ENABLED=1.
+
+Usage: LLM_STUB_LATENCY_MEAN=0.5 python bench_llm_pipeline.py [requests] [concurrency] [--stream]
+"""
+import os
+import sys
+import time
+import asyncio
+
+os.environ.setdefault("LLM_PROVIDER", "stub")
+os.environ.setdefault("SUMMARY_CACHE_ENABLED", "0")
+
+from llm_client import get_llm_client
+from utils import create_website_summary_response_async, stream_website_summary_async
+
+ARTICLE = ("The city council approved the new transit budget after a long debate about bus lanes, "
+           "parking fees and the timeline for the harbour bridge repairs. ") * 8
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))] if ordered else 0.0
+
+
+async def one_request(index, stream, latencies, first_tokens, errors):
+    website_data = {'title': f'Council budget #{index}', 'content': f"{index} {ARTICLE}", 'url': f'https://example.com/{index}'}
+    started = time.perf_counter()
+    try:
+        if stream:
+            got_first = False
+            async for event, _ in stream_website_summary_async('summarize', website_data, bot_id='delhi_mentor_male'):
+                if event == 'token' and not got_first:
+                    got_first = True
+                    first_tokens.append(time.perf_counter() - started)
+        else:
+            await create_website_summary_response_async('summarize', website_data, bot_id='delhi_mentor_male')
+        latencies.append(time.perf_counter() - started)
+    except Exception as e:
+        errors.append(type(e).__name__)
+
+
+async def run(requests, concurrency, stream):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, first_tokens, errors = [], [], []
+
+    async def limited(index):
+        async with semaphore:
+            await one_request(index, stream, latencies, first_tokens, errors)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    print(f"{requests} requests, concurrency {concurrency}, {'streaming' if stream else 'blocking'} "
+          f"({get_llm_client().name} provider): {requests / elapsed:.1f} req/s over {elapsed:.2f} s")
+    print("latency  p50 {:.3f}  p95 {:.3f}  p99 {:.3f}  max {:.3f} s".format(
+        percentile(latencies, 0.5), percentile(latencies, 0.95), percentile(latencies, 0.99),
+        max(latencies, default=0.0)))
+    if first_tokens:
+        print("first token  p50 {:.3f}  p95 {:.3f} s".format(percentile(first_tokens, 0.5), percentile(first_tokens, 0.95)))
+    print(f"errors: {len(errors)} {sorted(set(errors))}")
+    print(get_llm_client().stats())
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    requests = int(args[0]) if args else 200
+    concurrency = int(args[1]) if len(args) > 1 else 50
+    asyncio.run(run(requests, concurrency, '--stream' in sys.argv))
+
+
+if __name__ == '__main__':
+    main()
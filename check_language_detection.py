@@ -0,0 +1,83 @@
+"""Labelled check of detect_song_language on song pages as our extractors see them.
+
+Covers native-script and romanized titles next to English descriptions and extractor labels,
+the five supported languages, unsupported languages and links without any readable text.
+Exits non-zero when a case is misclassified.
+
+Usage: python check_language_detection.py
+"""
+import sys
+from language_detection import detect_song_language, classify_song
+
+# (content, url, title, expected language)
+CASES = [
+    # Native-script or romanized titles with English descriptions (YouTube pages)
+    ("Title: केसरिया - Kesariya | Brahmāstra. Channel: Sony Music India. Description: Presenting the official "
+     "video of Kesariya from the movie Brahmastra, starring Ranbir Kapoor and Alia Bhatt. Sung by Arijit Singh, "
+     "music by Pritam, lyrics by Amitabh Bhattacharya. Subscribe to our channel for the latest music videos and "
+     "updates. Follow us on Instagram and Twitter. Duration: 4:28. Views: 512,345,678",
+     "https://www.youtube.com/watch?v=BddP6PYo2gs", "केसरिया - Kesariya | Brahmāstra", "hindi"),
+    ("Title: 米津玄師 MV「Lemon」. Channel: Kenshi Yonezu. Description: Official music video for Lemon, the theme "
+     "song of the TBS drama Unnatural. Available now on all streaming platforms. Follow the artist for tour dates "
+     "and news. Views: 900,000,000",
+     "https://www.youtube.com/watch?v=SX_ViT4Ra7k", "米津玄師 MV「Lemon」", "japanese"),
+    ("Title: Tum Hi Ho Aashiqui 2. Channel: T-Series. Description: Presenting the full video song of Tum Hi Ho "
+     "from the movie Aashiqui 2, starring Aditya Roy Kapur and Shraddha Kapoor. The song is sung by Arijit Singh "
+     "and composed by Mithoon. Subscribe for the latest music videos and updates.",
+     "https://www.youtube.com/watch?v=Umqb9KENgmk", "Tum Hi Ho Aashiqui 2", "hindi"),
+    ("YOASOBI「夜に駆ける」Official Music Video", "https://youtube.com/watch?v=x8VYWazR5mE", "夜に駆ける", "japanese"),
+    ("pretender official髭男dism", "https://youtu.be/TQ8WlA2GXbk", "Pretender", "japanese"),
+    ("Raataan Lambiyan – Official Video. Channel: SonyMusicIndia. tere bina na guzara ae",
+     "https://www.youtube.com/watch?v=gvyUuxdRdR4", "Raataan Lambiyan", "hindi"),
+    ("Title: Kal Ho Naa Ho. Channel: T-Series. har ghadi badal rahi hai roop zindagi",
+     "https://youtube.com/watch?v=g0eO74UmRBs", "Kal Ho Naa Ho", "hindi"),
+    # Latin-script languages
+    ("Title: Ed Sheeran - Perfect (Official Music Video). Channel: Ed Sheeran. Description: The official music "
+     "video for Ed Sheeran - Perfect. Stream or download the new album now. Follow Ed on Instagram.",
+     "https://www.youtube.com/watch?v=2Vv-BfVoq4g", "Ed Sheeran - Perfect (Official Music Video)", "english"),
+    ("Title: Beyoncé - Halo. Description: Music video by Beyoncé performing Halo. (C) 2009 SONY BMG MUSIC "
+     "ENTERTAINMENT", "https://www.youtube.com/watch?v=bnVUHWCynig", "Beyoncé - Halo", "english"),
+    ("Title: Stromae - Papaoutai (Clip officiel). Channel: Stromae. Description: Papaoutai, le clip officiel. "
+     "Paroles et musique de Stromae, extrait de l'album Racine carrée.",
+     "https://www.youtube.com/watch?v=oiKj0Z_Xnjc", "Stromae - Papaoutai (Clip officiel)", "french"),
+    ("Title: Helene Fischer | Atemlos durch die Nacht (Lyric Video). Description: Das offizielle Lyric Video zu "
+     "Atemlos durch die Nacht von Helene Fischer.",
+     "https://www.youtube.com/watch?v=haECT-SerHk", "Helene Fischer | Atemlos durch die Nacht (Lyric Video)", "german"),
+    # Spotify metadata pages
+    ("Title: Tum Hi Ho. Artist: Arijit Singh. Description: Listen to Tum Hi Ho on Spotify. Song · 2013",
+     "https://open.spotify.com/track/56zZ48jdyY2oDXHVnwg5Di", "Tum Hi Ho", "hindi"),
+    ("Title: Perfect. Artist: Ed Sheeran. Description: Listen to Perfect on Spotify. Ed Sheeran · Song · 2017",
+     "https://open.spotify.com/track/0tgVpDi06FyKpA1z0VMD4v", "Perfect", "english"),
+    ("Title: La Vie en rose. Artist: Edith Piaf. Chanson française classique",
+     "https://open.spotify.com/track/3czDZzjTYmPYVSVNOsfBYZ", "La Vie en rose", "french"),
+    ("Title: 99 Luftballons. Artist: Nena. Description: Hör dir 99 Luftballons auf Spotify an. Nena · Song · 1983",
+     "https://open.spotify.com/track/6HA97v4wEGQ5TUClRM0XLc", "99 Luftballons", "german"),
+    ("", "https://www.jiosaavn.com/song/raataan-lambiyan/Ry4DfTJDY1s", "", "hindi"),
+    # Unsupported languages and links without readable text
+    ("사랑해 너를 사랑해 이 노래는 밤하늘의 별에 관한 노래입니다", "https://youtube.com/watch?v=k1", "사랑해", "unknown"),
+    ("Despacito es una canción de Luis Fonsi, quiero respirar tu cuello despacito y que me digas cosas al oído",
+     "https://youtube.com/watch?v=kJQP7kiw5Fk", "Despacito", "unknown"),
+    ("Volare è una canzone italiana, nel blu dipinto di blu, felice di stare lassù",
+     "https://youtube.com/watch?v=t4IjJav7xbg", "Volare", "unknown"),
+    ("Garota de Ipanema é uma canção brasileira, olha que coisa mais linda mais cheia de graça",
+     "https://youtube.com/watch?v=c5QfXjsoNe4", "Garota de Ipanema", "unknown"),
+    ("", "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC", "", "unknown"),
+    ("", "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "", "unknown"),
+    ("", "", "", "unknown"),
+]
+
+
+def main():
+    failures = 0
+    for content, url, title, expected in CASES:
+        detected = detect_song_language(content, url, title)
+        ok = detected == expected
+        failures += not ok
+        ranked = ', '.join(f"{language} {confidence:.2f}" for language, confidence in classify_song(content, url, title)[:2])
+        print(f"{'ok  ' if ok else 'FAIL'} {detected:<9} (expected {expected:<9} | {ranked}) {title or url or '<empty>'}")
+    print(f"\n{len(CASES) - failures}/{len(CASES)} correct")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
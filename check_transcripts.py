@@ -0,0 +1,82 @@
+"""Offline check of the transcript subsystem against the caption files in fixtures/captions.
+
+Runs get_transcript through TRANSCRIPT_FIXTURE_DIR for a legacy (<transcript><text>) and an
+srv3 (<timedtext><body><p>) track, re-parses both in tiny chunks to exercise the streaming
+parser, and checks that parsing stops reading once the character budget is filled.
+Exits non-zero when a check fails.
+
+Usage: python check_transcripts.py
+"""
+import os
+import sys
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'captions')
+os.environ["TRANSCRIPT_FIXTURE_DIR"] = FIXTURES_DIR
+os.environ["TRANSCRIPT_ENABLED"] = "1"
+
+from transcripts import get_transcript, parse_timedtext, select_caption_track, caption_tracks
+
+# video_id -> transcript expected from its fixture (annotations and empty cues dropped,
+# entities decoded, whitespace collapsed, srv3 word segments joined)
+EXPECTED = {
+    'fixtureLeg1': ('the city lights are fading out it\'s a "quiet" night on the harbour road '
+                    'you & me, we walk along the shore and the waves keep time > the clocks '
+                    'café doors are closing one by one'),
+    'fixtureSrv3': ('the city lights are fading out it\'s a "quiet" night you & me, we walk along '
+                    'café doors are closing'),
+}
+
+
+def player_response(video_id):
+    """Minimal ytInitialPlayerResponse listing an auto-generated and an uploaded English track"""
+    base = f'https://www.youtube.com/api/timedtext?v={video_id}'
+    return {
+        'videoDetails': {'videoId': video_id},
+        'captions': {'playerCaptionsTracklistRenderer': {'captionTracks': [
+            {'baseUrl': base + '&kind=asr&lang=en', 'languageCode': 'en', 'kind': 'asr'},
+            {'baseUrl': base + '&lang=en', 'languageCode': 'en'},
+            {'baseUrl': base + '&lang=fr', 'languageCode': 'fr'},
+        ]}},
+    }
+
+
+def file_chunks(path, size, consumed):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(size), b''):
+            consumed.append(len(chunk))
+            yield chunk
+
+
+def main():
+    failures = []
+
+    def check(name, ok, detail=''):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}{'' if ok else ': ' + detail}")
+        if not ok:
+            failures.append(name)
+
+    track = select_caption_track(caption_tracks(player_response('fixtureLeg1')))
+    check('uploaded track preferred over auto-generated', 'kind' not in track, repr(track))
+
+    for video_id, expected in EXPECTED.items():
+        path = os.path.join(FIXTURES_DIR, f'{video_id}.xml')
+        transcript = get_transcript(player_response(video_id), video_id)
+        check(f'{video_id}: transcript via fixture dir', transcript == expected, repr(transcript))
+
+        chunked = parse_timedtext(file_chunks(path, 7, []), max_chars=10_000)
+        check(f'{video_id}: same text when streamed in 7-byte chunks', chunked == expected, repr(chunked))
+
+        consumed = []
+        limited = parse_timedtext(file_chunks(path, 64, consumed), max_chars=30)
+        check(f'{video_id}: cut at the character budget', limited == expected[:30], repr(limited))
+        check(f'{video_id}: stops reading early', sum(consumed) < os.path.getsize(path),
+              f'{sum(consumed)} of {os.path.getsize(path)} bytes read')
+
+    check('missing fixture gives an empty transcript', get_transcript(player_response('noSuchVid00'), 'noSuchVid00') == '')
+
+    print(f"\n{'all checks passed' if not failures else f'{len(failures)} check(s) failed'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
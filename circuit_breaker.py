@@ -0,0 +1,150 @@
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", "60"))
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "10000"))
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))                   # outcomes remembered per domain
+CIRCUIT_MIN_REQUESTS = int(os.getenv("CIRCUIT_MIN_REQUESTS", "5"))        # before the error rate is trusted
+CIRCUIT_ERROR_THRESHOLD = float(os.getenv("CIRCUIT_ERROR_THRESHOLD", "0.5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class NegativeCache:
+    """Short-TTL memory of URLs whose fetch just failed"""
+
+    def __init__(self, ttl=NEGATIVE_CACHE_TTL, max_entries=NEGATIVE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> expires_at
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def add(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = time.time() + self.ttl
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def contains(self, key):
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._entries[key]
+                return False
+            self.hits += 1
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            live = [key for key, expires_at in self._entries.items() if expires_at > now]
+        return {'entries': len(live), 'hits': self.hits, 'urls': live[:50]}
+
+
+class _DomainCircuit:
+    def __init__(self, window):
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.rejected = 0
+        self.trips = 0
+
+
+class CircuitBreakers:
+    """Per-domain circuit breakers: closed -> open when the error rate crosses the threshold,
+    open -> half-open after a cool-down (one trial request), half-open -> closed on success."""
+
+    def __init__(self, window=CIRCUIT_WINDOW, min_requests=CIRCUIT_MIN_REQUESTS,
+                 error_threshold=CIRCUIT_ERROR_THRESHOLD, open_seconds=CIRCUIT_OPEN_SECONDS):
+        self.window = window
+        self.min_requests = min_requests
+        self.error_threshold = error_threshold
+        self.open_seconds = open_seconds
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, domain):
+        circuit = self._circuits.get(domain)
+        if circuit is None:
+            circuit = self._circuits[domain] = _DomainCircuit(self.window)
+        return circuit
+
+    def allow(self, domain):
+        """Return True if a request to `domain` may proceed"""
+        with self._lock:
+            circuit = self._circuit(domain)
+            if circuit.state == CLOSED:
+                return True
+            if circuit.state == OPEN and time.monotonic() - circuit.opened_at >= self.open_seconds:
+                circuit.state = HALF_OPEN
+                circuit.trial_in_flight = False
+            if circuit.state == HALF_OPEN and not circuit.trial_in_flight:
+                circuit.trial_in_flight = True
+                return True
+            circuit.rejected += 1
+            return False
+
+    def record(self, domain, success):
+        with self._lock:
+            circuit = self._circuit(domain)
+            if circuit.state == HALF_OPEN:
+                circuit.trial_in_flight = False
+                if success:
+                    circuit.state = CLOSED
+                    circuit.outcomes.clear()
+                else:
+                    self._trip(circuit)
+                return
+            circuit.outcomes.append(success)
+            if circuit.state == CLOSED and len(circuit.outcomes) >= self.min_requests:
+                error_rate = circuit.outcomes.count(False) / len(circuit.outcomes)
+                if error_rate >= self.error_threshold:
+                    self._trip(circuit)
+                    print(f"🔌 Circuit opened for {domain} (error rate {error_rate:.0%})")
+
+    def _trip(self, circuit):
+        circuit.state = OPEN
+        circuit.opened_at = time.monotonic()
+        circuit.trips += 1
+
+    def state(self, domain):
+        with self._lock:
+            circuit = self._circuits.get(domain)
+            return circuit.state if circuit else CLOSED
+
+    def stats(self):
+        """State of every domain that has seen failures, so tripped domains are visible"""
+        with self._lock:
+            result = {}
+            for domain, circuit in self._circuits.items():
+                failures = circuit.outcomes.count(False)
+                if circuit.state == CLOSED and not failures and not circuit.trips:
+                    continue
+                result[domain] = {
+                    'state': circuit.state,
+                    'error_rate': failures / len(circuit.outcomes) if circuit.outcomes else 0.0,
+                    'samples': len(circuit.outcomes),
+                    'trips': circuit.trips,
+                    'rejected': circuit.rejected,
+                    'open_for_seconds': max(0.0, self.open_seconds - (time.monotonic() - circuit.opened_at))
+                    if circuit.state == OPEN else 0.0,
+                }
+            return result
+
+
+negative_cache = NegativeCache()
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,241 @@
+import os
+import time
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+CONTENT_CACHE_ENABLED = os.getenv("CONTENT_CACHE_ENABLED", "1") != "0"
+CONTENT_CACHE_MAX_BYTES = int(os.getenv("CONTENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CONTENT_CACHE_DB = os.getenv("CONTENT_CACHE_DB", "")  # optional SQLite file for the on-disk tier
+
+# TTL (seconds) per content kind: news goes stale fast, songs/videos barely change
+CONTENT_CACHE_TTLS = {
+    'news': int(os.getenv("CONTENT_CACHE_TTL_NEWS", "600")),
+    'youtube': int(os.getenv("CONTENT_CACHE_TTL_YOUTUBE", "86400")),
+    'spotify': int(os.getenv("CONTENT_CACHE_TTL_SPOTIFY", "86400")),
+}
+
+# Query parameters that never change what a page shows
+_TRACKING_PARAMS = {'fbclid', 'gclid', 'si', 'feature', 'ref', 'ref_src', 'igshid', 'pp', 'ab_channel'}
+
+
+def canonicalize_url(url):
+    """Normalize a URL so that trivially different links share one cache key"""
+    url = url.strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if host.startswith('m.'):
+        host = host[2:]
+    path = parsed.path or '/'
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+             if k not in _TRACKING_PARAMS and not k.startswith('utm_')]
+
+    # youtu.be/<id> and youtube.com/watch?v=<id> are the same video
+    if host == 'youtu.be':
+        host, query = 'youtube.com', [('v', path.strip('/'))] + query
+        path = '/watch'
+    if host == 'youtube.com' and path == '/watch':
+        query = [(k, v) for k, v in query if k in ('v', 't', 'list')]
+
+    if len(path) > 1:
+        path = path.rstrip('/')
+    return urlunparse(('https', host, path, '', urlencode(sorted(query)), ''))
+
+
+def content_kind(url, data=None):
+    """Classify cached content for TTL purposes: youtube, spotify or news"""
+    host = urlparse(canonicalize_url(url)).netloc
+    if (data and data.get('type') == 'youtube_video') or host.endswith('youtube.com'):
+        return 'youtube'
+    if host.endswith('spotify.com'):
+        return 'spotify'
+    return 'news'
+
+
+class MemoryLRUTier:
+    """In-process LRU tier bounded by the approximate serialized size of its entries"""
+
+    name = 'memory'
+
+    def __init__(self, max_bytes=CONTENT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, size=None):
+        size = size if size is not None else len(json.dumps(value, default=str).encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'max_bytes': self.max_bytes,
+                    'evictions': self.evictions}
+
+
+class SQLiteTier:
+    """Optional on-disk tier so cached pages survive restarts and are shared by workers"""
+
+    name = 'disk'
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.evictions = 0
+        self._sets_since_purge = 0
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl, size=None):
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                               (key, payload, time.time() + ttl))
+            self._conn.commit()
+            self._sets_since_purge += 1
+            purge = self._sets_since_purge >= 100
+            if purge:
+                self._sets_since_purge = 0
+        if purge:
+            self.purge_expired()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            self.evictions += cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {'entries': entries, 'path': self.path, 'evictions': self.evictions}
+
+
+class ContentCache:
+    """Canonical-URL keyed cache of extracted `website_data` dicts, checked tier by tier"""
+
+    def __init__(self, tiers, ttls=None):
+        self.tiers = tiers
+        self.ttls = dict(CONTENT_CACHE_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'sets': 0}
+        self._tier_hits = {tier.name: 0 for tier in tiers}
+
+    def get(self, url):
+        key = canonicalize_url(url)
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is None:
+                continue
+            with self._lock:
+                self._counters['hits'] += 1
+                self._tier_hits[tier.name] += 1
+            # Promote lower-tier hits so the next lookup is served from memory
+            if index > 0:
+                ttl = self.ttls[content_kind(url, value)]
+                for upper in self.tiers[:index]:
+                    upper.set(key, value, ttl)
+            return dict(value)
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def set(self, url, data):
+        if not data:
+            return
+        key = canonicalize_url(url)
+        ttl = self.ttls[content_kind(url, data)]
+        size = len(json.dumps(data, default=str).encode('utf-8'))
+        for tier in self.tiers:
+            tier.set(key, dict(data), ttl, size=size)
+        with self._lock:
+            self._counters['sets'] += 1
+
+    def delete(self, url):
+        key = canonicalize_url(url)
+        for tier in self.tiers:
+            tier.delete(key)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters, tier_hits=dict(self._tier_hits))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['evictions'] = sum(tier.evictions for tier in self.tiers)
+        stats['tiers'] = {tier.name: tier.stats() for tier in self.tiers}
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_content_cache():
+    """Return the process-wide content cache, or None when caching is disabled"""
+    global _cache
+    if not CONTENT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            tiers = [MemoryLRUTier(CONTENT_CACHE_MAX_BYTES)]
+            if CONTENT_CACHE_DB:
+                tiers.append(SQLiteTier(CONTENT_CACHE_DB))
+            _cache = ContentCache(tiers)
+        return _cache
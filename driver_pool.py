@@ -0,0 +1,235 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+# Pool sizing / recycling knobs
+CHROME_POOL_SIZE = int(os.getenv("CHROME_POOL_SIZE", os.getenv("BROWSER_WORKERS", "4")))
+CHROME_MAX_PAGES = int(os.getenv("CHROME_MAX_PAGES", "50"))            # recycle a driver after N pages
+CHROME_MAX_HEAP_MB = float(os.getenv("CHROME_MAX_HEAP_MB", "512"))      # recycle when JS heap grows past this
+CHROME_CHECKOUT_TIMEOUT = float(os.getenv("CHROME_CHECKOUT_TIMEOUT", "30"))
+
+
+def build_chrome_options():
+    """Headless Chrome options shared by every pooled driver"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    return chrome_options
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+
+class ChromeDriverPool:
+    """A bounded pool of warm headless Chrome drivers shared by all requests in a worker"""
+
+    def __init__(self, size=CHROME_POOL_SIZE, max_pages=CHROME_MAX_PAGES, max_heap_mb=CHROME_MAX_HEAP_MB,
+                 checkout_timeout=CHROME_CHECKOUT_TIMEOUT, driver_factory=None):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_heap_mb = max_heap_mb
+        self.checkout_timeout = checkout_timeout
+        self._driver_factory = driver_factory or (lambda: webdriver.Chrome(options=build_chrome_options()))
+        self._idle = []
+        self._in_use = {}
+        self._total = 0  # live drivers, idle + in use + being started
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'unhealthy': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+        }
+
+    # --- checkout / return -------------------------------------------------
+
+    def checkout(self, timeout=None):
+        """Borrow a healthy driver, starting a new one if the pool is not full yet"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Chrome driver pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    pooled = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise TimeoutError(f"No Chrome driver available after {timeout:.1f}s")
+                waited = True
+                self._cond.wait(remaining)
+
+        wait_seconds = time.monotonic() - started
+        if pooled is None or not self._is_healthy(pooled):
+            if pooled is not None:
+                with self._cond:
+                    self._stats['unhealthy'] += 1
+                self._quit(pooled)
+            try:
+                pooled = self._start_driver()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+
+        with self._cond:
+            self._in_use[id(pooled.driver)] = pooled
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+            self._stats['total_wait_seconds'] += wait_seconds
+            self._stats['max_wait_seconds'] = max(self._stats['max_wait_seconds'], wait_seconds)
+        return pooled.driver
+
+    def release(self, driver, discard=False):
+        """Return a driver to the pool, recycling it if it is worn out or broken"""
+        with self._cond:
+            pooled = self._in_use.pop(id(driver), None)
+        if pooled is None:
+            return
+        pooled.pages += 1
+
+        recycle = discard or self._closed or pooled.pages >= self.max_pages
+        if not recycle and self.max_heap_mb:
+            heap_mb = self._js_heap_mb(pooled.driver)
+            recycle = heap_mb is not None and heap_mb >= self.max_heap_mb
+        if not recycle:
+            recycle = not self._reset_state(pooled.driver)
+
+        if recycle:
+            self._quit(pooled)
+            with self._cond:
+                self._stats['recycled'] += 1
+                self._total -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager: `with pool.driver() as driver: ...`"""
+        driver = self.checkout(timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # A driver that raised may be wedged; don't hand it to the next request
+            self.release(driver, discard=failed)
+
+    # --- maintenance -------------------------------------------------------
+
+    def _start_driver(self):
+        driver = self._driver_factory()
+        with self._cond:
+            self._stats['created'] += 1
+        print("🚗 ChromeDriver started for pool")
+        return _PooledDriver(driver)
+
+    def _is_healthy(self, pooled):
+        try:
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _js_heap_mb(self, driver):
+        try:
+            used = driver.execute_script("return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null")
+            return used / (1024 * 1024) if used else None
+        except Exception:
+            return None
+
+    def _reset_state(self, driver):
+        """Wipe cookies, storage and cache so the next request starts from a clean profile"""
+        try:
+            driver.delete_all_cookies()
+            driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+            except Exception:
+                pass
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"⚠️ Could not reset pooled driver, recycling it: {e}")
+            return False
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def stats(self):
+        """Occupancy and wait-time figures for sizing the pool"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'size': self.size,
+                'live': self._total,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'occupancy': len(self._in_use) / self.size,
+            })
+        stats['avg_wait_seconds'] = stats['total_wait_seconds'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+    def close(self):
+        """Quit every idle driver; in-use drivers are quit when they are returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Return the worker-wide shared driver pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ChromeDriverPool()
+        return _pool
+
+
+def close_driver_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,40 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Each blocking stage of the fetch-and-summarize pipeline gets its own bounded
+# thread pool so a slow stage (e.g. Selenium) can't starve the others and none
+# of them ever blocks the event loop. Sizes are configurable per stage.
+STAGE_WORKERS = {
+    'fetch': int(os.getenv("FETCH_WORKERS", "16")),      # newspaper3k / plain HTTP downloads
+    'browser': int(os.getenv("BROWSER_WORKERS", "4")),   # Selenium page renders
+    'parse': int(os.getenv("PARSE_WORKERS", "4")),       # BeautifulSoup parsing / extraction
+    'llm': int(os.getenv("LLM_WORKERS", "16")),          # Gemini generation
+}
+
+_executors = {}
+
+
+def get_executor(stage):
+    """Return the (lazily created) bounded executor for a pipeline stage"""
+    executor = _executors.get(stage)
+    if executor is None:
+        if stage not in STAGE_WORKERS:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+        executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS[stage], thread_name_prefix=f"{stage}-worker")
+        _executors[stage] = executor
+    return executor
+
+
+async def run_blocking(stage, func, *args, **kwargs):
+    """Run a blocking callable on the executor for `stage` without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(stage), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executors(wait=True):
+    """Shut down all stage executors (called on application shutdown)"""
+    for executor in _executors.values():
+        executor.shutdown(wait=wait)
+    _executors.clear()
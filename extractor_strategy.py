@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import random
+import tempfile
+import threading
+from urllib.parse import urlparse
+from executors import get_executor
+
+EXTRACTOR_STATS_PATH = os.getenv("EXTRACTOR_STATS_PATH", "extractor_stats.json")
+EXTRACTOR_STATS_MIN_SAMPLES = int(os.getenv("EXTRACTOR_STATS_MIN_SAMPLES", "5"))
+EXTRACTOR_STATS_ALPHA = float(os.getenv("EXTRACTOR_STATS_ALPHA", "0.2"))          # EWMA weight of the newest sample
+EXTRACTOR_EXPLORE_RATE = float(os.getenv("EXTRACTOR_EXPLORE_RATE", "0.05"))       # share of requests using the default order
+EXTRACTOR_STATS_SAVE_INTERVAL = float(os.getenv("EXTRACTOR_STATS_SAVE_INTERVAL", "30"))
+# Manual routing, e.g. "open.spotify.com=metadata,selenium;example.com=selenium"
+EXTRACTOR_OVERRIDES = os.getenv("EXTRACTOR_OVERRIDES", "")
+
+
+def domain_of(url):
+    host = urlparse(url if '://' in url else 'https://' + url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _parse_overrides(spec):
+    overrides = {}
+    for item in spec.split(';'):
+        if '=' not in item:
+            continue
+        domain, order = item.split('=', 1)
+        names = [name.strip() for name in order.split(',') if name.strip()]
+        if domain.strip() and names:
+            overrides[domain.strip().lower()] = names
+    return overrides
+
+
+class ExtractorStrategy:
+    """Per-domain table of extractor success rates and latencies used to pick the extraction order.
+
+    Until a domain has enough samples the default chain is used unchanged; after that,
+    extractors are ordered by expected time to a successful extraction
+    (latency / success rate). Manual overrides always win: EXTRACTOR_OVERRIDES from the
+    environment first, then pins set with set_override (only the latter are persisted).
+    """
+
+    def __init__(self, path=EXTRACTOR_STATS_PATH, min_samples=EXTRACTOR_STATS_MIN_SAMPLES,
+                 alpha=EXTRACTOR_STATS_ALPHA, explore_rate=EXTRACTOR_EXPLORE_RATE):
+        self.path = path
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.explore_rate = explore_rate
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one writer at a time, so snapshots land in order
+        self._save_pending = False
+        self._table = {}  # domain -> extractor -> {'attempts', 'successes', 'success_rate', 'latency'}
+        self._overrides = {}      # pins from set_override, saved with the table
+        self._env_overrides = _parse_overrides(EXTRACTOR_OVERRIDES)  # in memory only
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.load()
+
+    def order(self, url, default_chain):
+        """Return the extractors of `default_chain` reordered for the URL's domain"""
+        domain = domain_of(url)
+        with self._lock:
+            override = self._env_overrides.get(domain) or self._overrides.get(domain)
+            if override:
+                return list(override)
+            stats = self._table.get(domain, {})
+            if not stats or random.random() < self.explore_rate:
+                return list(default_chain)
+            if any(stats.get(name, {}).get('attempts', 0) < self.min_samples for name in default_chain):
+                # Not enough evidence for every candidate yet; only demote proven failures
+                return sorted(default_chain, key=lambda name: self._is_hopeless(stats.get(name)))
+
+            def expected_cost(name):
+                entry = stats[name]
+                return entry['latency'] / max(entry['success_rate'], 0.02)
+
+            return sorted(default_chain, key=expected_cost)
+
+    def _is_hopeless(self, entry):
+        return bool(entry and entry['attempts'] >= self.min_samples and entry['success_rate'] < 0.1)
+
+    def record(self, url, extractor, success, latency):
+        """Record the outcome of one extractor attempt"""
+        domain = domain_of(url)
+        with self._lock:
+            entry = self._table.setdefault(domain, {}).setdefault(extractor, {
+                'attempts': 0, 'successes': 0, 'success_rate': 1.0 if success else 0.0, 'latency': latency,
+            })
+            entry['attempts'] += 1
+            entry['successes'] += 1 if success else 0
+            entry['success_rate'] += self.alpha * ((1.0 if success else 0.0) - entry['success_rate'])
+            entry['latency'] += self.alpha * (latency - entry['latency'])
+            self._dirty = True
+            save_due = not self._save_pending and time.monotonic() - self._last_save >= EXTRACTOR_STATS_SAVE_INTERVAL
+            if save_due:
+                self._save_pending = True
+        if save_due:
+            # record() also runs on the event loop; the JSON dump and file write go to a fetch worker
+            try:
+                get_executor('fetch').submit(self.save)
+            except RuntimeError:  # executors already shut down; the shutdown hook saves
+                with self._lock:
+                    self._save_pending = False
+
+    def set_override(self, domain, order):
+        """Pin a domain to a fixed extractor order; pass None to remove the pin.
+
+        EXTRACTOR_OVERRIDES entries for the same domain still take precedence.
+        """
+        with self._lock:
+            if order:
+                self._overrides[domain.lower()] = list(order)
+            else:
+                self._overrides.pop(domain.lower(), None)
+            self._dirty = True
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            with self._lock:
+                self._table = saved.get('domains', {})
+                self._overrides = saved.get('overrides', {})
+            print(f"📈 Loaded extractor stats for {len(self._table)} domains")
+        except Exception as e:
+            print(f"⚠️ Could not load extractor stats from {self.path}: {e}")
+
+    def save(self):
+        """Persist the table atomically so it survives restarts (blocking; keep it off the event loop)"""
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                self._save_pending = False
+                if not self._dirty:
+                    return
+                payload = json.dumps({'domains': self._table, 'overrides': self._overrides}, indent=1)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            tmp_path = None
+            try:
+                directory, name = os.path.split(os.path.abspath(self.path))
+                with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, prefix=f"{name}.",
+                                                 suffix='.tmp', delete=False) as f:
+                    tmp_path = f.name
+                    f.write(payload)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"⚠️ Could not save extractor stats to {self.path}: {e}")
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'domains': json.loads(json.dumps(self._table)),
+                'overrides': dict(self._overrides),
+                'env_overrides': dict(self._env_overrides),
+            }
+
+
+_strategy = None
+_strategy_lock = threading.Lock()
+
+
+def get_extractor_strategy():
+    """Return the process-wide extractor strategy table"""
+    global _strategy
+    with _strategy_lock:
+        if _strategy is None:
+            _strategy = ExtractorStrategy()
+        return _strategy
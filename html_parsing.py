@@ -0,0 +1,95 @@
+import os
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+def _available_backends():
+    backends = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        backends.insert(0, 'lxml')
+    except ImportError:
+        pass
+    try:
+        import html5lib  # noqa: F401
+        backends.append('html5lib')
+    except ImportError:
+        pass
+    return backends
+
+
+AVAILABLE_PARSERS = _available_backends()
+
+# lxml is a C parser and several times faster than the pure-Python html.parser on big pages
+HTML_PARSER_DEFAULT = os.getenv("HTML_PARSER_DEFAULT", AVAILABLE_PARSERS[0])
+
+# Per content type overrides, e.g. HTML_PARSER_YOUTUBE=html.parser
+HTML_PARSERS = {
+    'youtube': os.getenv("HTML_PARSER_YOUTUBE", HTML_PARSER_DEFAULT),
+    'website': os.getenv("HTML_PARSER_WEBSITE", HTML_PARSER_DEFAULT),
+    'metadata': os.getenv("HTML_PARSER_METADATA", HTML_PARSER_DEFAULT),
+}
+
+
+def parser_for(content_type):
+    """Return the BeautifulSoup tree builder to use for a content type"""
+    parser = HTML_PARSERS.get(content_type, HTML_PARSER_DEFAULT)
+    if parser not in AVAILABLE_PARSERS:
+        print(f"⚠️ HTML parser '{parser}' is not installed, using {AVAILABLE_PARSERS[0]}")
+        parser = AVAILABLE_PARSERS[0]
+    return parser
+
+
+def make_soup(markup, content_type='website', encoding=None, parse_only=None):
+    """Build a soup with the configured backend for `content_type`.
+
+    `markup` may be str or raw bytes; bytes are handed straight to the parser (with the
+    HTTP charset as a hint when known) instead of being decoded into a second copy first.
+    """
+    kwargs = {}
+    if isinstance(markup, bytes) and encoding:
+        kwargs['from_encoding'] = encoding
+    if parse_only is not None:
+        kwargs['parse_only'] = parse_only
+    return BeautifulSoup(markup, parser_for(content_type), **kwargs)
+
+
+# Partial parsing: only these elements are materialized into the tree
+PARTIAL_PARSE = os.getenv("PARTIAL_PARSE", "1") != "0"
+PARTIAL_TAGS = ['title', 'meta', 'link', 'script']
+PARTIAL_MAX_SCRIPTS = int(os.getenv("PARTIAL_MAX_SCRIPTS", "4"))
+
+_HEAD_END = re.compile(r'</head\s*>', re.IGNORECASE)
+_SCRIPT_BLOCK = re.compile(r'<script\b([^>]*)>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+_HEAD_END_BYTES = re.compile(_HEAD_END.pattern.encode('ascii'), re.IGNORECASE)
+_SCRIPT_BLOCK_BYTES = re.compile(_SCRIPT_BLOCK.pattern.encode('ascii'), re.IGNORECASE | re.DOTALL)
+
+
+def head_and_scripts(markup, script_types=('application/ld+json',), max_scripts=PARTIAL_MAX_SCRIPTS):
+    """Cut a document down to its <head> plus the first `max_scripts` body scripts of the wanted types.
+
+    Reading stops at </head> for the head part and as soon as enough scripts are collected
+    for the body part, so most of a multi-megabyte page is never looked at. Works on str or
+    bytes without converting the whole document.
+    """
+    is_bytes = isinstance(markup, bytes)
+    head_end = (_HEAD_END_BYTES if is_bytes else _HEAD_END).search(markup)
+    if head_end is None:
+        return markup
+    parts = [markup[:head_end.end()]]
+    wanted = tuple((t.encode('ascii') if is_bytes else t).lower() for t in script_types)
+    found = 0
+    if wanted and max_scripts:
+        for match in (_SCRIPT_BLOCK_BYTES if is_bytes else _SCRIPT_BLOCK).finditer(markup, head_end.end()):
+            if any(t in match.group(1).lower() for t in wanted):
+                parts.append(match.group(0))
+                found += 1
+                if found >= max_scripts:
+                    break
+    return (b'' if is_bytes else '').join(parts)
+
+
+def make_partial_soup(markup, content_type='metadata', encoding=None, script_types=('application/ld+json',)):
+    """Build a soup containing only the head metadata (title/meta/link) and selected scripts"""
+    partial = head_and_scripts(markup, script_types=script_types)
+    return make_soup(partial, content_type, encoding=encoding, parse_only=SoupStrainer(PARTIAL_TAGS))
@@ -0,0 +1,157 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Connection pool sizing: how many distinct hosts keep a pool, and how many
+# keep-alive connections each host may hold (requests beyond that wait for one)
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "8"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_MAX_BYTES = int(os.getenv("HTTP_MAX_BYTES", str(5 * 1024 * 1024)))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "1"))
+
+try:
+    # urllib3 transparently decodes brotli when one of these is installed
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        _ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/124.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,application/json;q=0.8,*/*;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': _ACCEPT_ENCODING,
+}
+
+
+class FetchCancelled(Exception):
+    """Raised when a download is abandoned because its cancel_event was set"""
+
+
+class FetchResult:
+    """Body and headers of a (possibly truncated) HTTP response"""
+
+    def __init__(self, url, status_code, headers, content, encoding, truncated):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.truncated = truncated
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide pooled session shared by every non-browser fetcher"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retries = Retry(total=HTTP_RETRIES, connect=HTTP_RETRIES, read=0, backoff_factor=0.2,
+                            status_forcelist=(502, 503, 504), allowed_methods=frozenset(['GET', 'HEAD']))
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_MAX_PER_HOST,
+                                  pool_block=True, max_retries=retries)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+
+@contextmanager
+def stream(url, params=None, headers=None, timeout=None, max_bytes=None, memory=None, cancel_event=None):
+    """GET a URL through the shared session and yield (response, chunks) for incremental reading.
+
+    `chunks` iterates over the (decoded) body and ends after `max_bytes`; every chunk is
+    charged to `memory` (a page_budget.PageLease) before it is handed out. The connection
+    is closed when the block exits, so a consumer that stops early stops the download too.
+    Once `cancel_event` (a threading.Event) is set, the next chunk raises FetchCancelled
+    instead, e.g. for the losers of a hedged extraction.
+    `response.truncated` tells whether the cap was hit. Raises for HTTP error statuses.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise FetchCancelled(url)
+    max_bytes = HTTP_MAX_BYTES if max_bytes is None else max_bytes
+    if memory is not None:
+        max_bytes = min(max_bytes, memory.remaining)
+    timeout = timeout if timeout is not None else (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    response = get_session().get(url, params=params, headers=headers, timeout=timeout, stream=True)
+    response.truncated = False
+
+    def chunks():
+        received = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if cancel_event is not None and cancel_event.is_set():
+                raise FetchCancelled(url)
+            if received + len(chunk) >= max_bytes:
+                chunk = chunk[:max_bytes - received]
+                response.truncated = True
+            received += len(chunk)
+            if memory is not None:
+                memory.charge(len(chunk))
+            yield chunk
+            if response.truncated:
+                return
+
+    try:
+        response.raise_for_status()
+        yield response, chunks()
+    finally:
+        response.close()
+
+
+def response_encoding(response):
+    # requests falls back to ISO-8859-1 for text/* without a charset; let callers sniff instead
+    return response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else None
+
+
+def fetch(url, params=None, headers=None, timeout=None, max_bytes=None, stop_at=None, memory=None, cancel_event=None):
+    """GET a URL through the shared session, reading at most `max_bytes` of (decoded) body.
+
+    If `stop_at` (bytes) is given, reading stops right after the first occurrence of it,
+    e.g. b'</head>' for head-only downloads. Body bytes are charged to `memory` when given.
+    Raises for HTTP error statuses, and FetchCancelled once `cancel_event` is set.
+    """
+    with stream(url, params=params, headers=headers, timeout=timeout, max_bytes=max_bytes,
+                memory=memory, cancel_event=cancel_event) as (response, chunks):
+        encoding = response_encoding(response)
+        parts = []
+        searched = b''
+        for chunk in chunks:
+            parts.append(chunk)
+            if stop_at is not None:
+                # Only re-scan the tail of what we already had plus the new chunk
+                window = searched[-len(stop_at):] + chunk
+                position = window.find(stop_at)
+                if position != -1:
+                    overshoot = len(window) - position - len(stop_at)
+                    content = b''.join(parts)
+                    return FetchResult(response.url, response.status_code, response.headers,
+                                       content[:len(content) - overshoot], encoding, True)
+                searched = window
+        return FetchResult(response.url, response.status_code, response.headers, b''.join(parts),
+                           encoding, response.truncated)
+
+
+def fetch_json(url, params=None, headers=None, timeout=None, memory=None):
+    """GET a small JSON document through the shared session"""
+    result = fetch(url, params=params, headers=headers, timeout=timeout, max_bytes=1024 * 1024, memory=memory)
+    return json.loads(result.content)
@@ -0,0 +1,434 @@
+import os
+import re
+import hashlib
+import threading
+from urllib.parse import urlparse, unquote
+import numpy as np
+from content_cache import MemoryLRUTier
+
+hindi_keywords = [
+        # Common Hindi words
+        "hai", "mein", "tum", "dil", "pyar", "tere", "hindi", "गीत", "गाना", "raataan", "lambiyan", "shershaah",
+        "kiara", "sid", "b praak", "jasleen", "royal", "anvita", "anvit", "kaur", "arijit", "singh", "bollywood",
+        "love song", "romantic song", "zindagi", "yaar", "mohabbat", "sapna", "chalo", "aaja", "jaana", "sun", "sapne",
+        "saath", "khwab", "yaadon", "yaari", "ishq", "janam", "safar", "pal", "raat", "din", "chand", "suraj", "aasman",
+        "dhadkan", "bekhayali", "tujhe", "mujhko", "sanam", "mehboob", "dosti", "shayar", "shayari", "kuch", "bata", "batao",
+        "kya", "kaise", "kaun", "kabhi", "kab", "kyun", "kyunki", "ab", "tab", "phir", "fir", "phir bhi", "tumse", "tumhi",
+        "tumko", "main", "mera", "meri", "mere", "apna", "apni", "apne", "sapno", "sapne", "khush", "khushi", "khushiyan",
+        "dard", "gumsum", "yaad", "yaadein", "yaadon", "yaariyan", "suno", "sunlo", "sun raha", "sun raha hai na tu",
+        "aankh", "aankhon", "aansu", "muskurana", "muskurane", "muskurata", "muskurati", "muskurate", "muskurahat",
+        "chahat", "chahatein", "chahata", "chahati", "chahate", "chah", "chaha", "chahiye", "chahungi", "chahunga",
+        "chahte", "chahtey", "chahte ho", "chahte hoon", "chahte hain", "chahte hoon", "chahte ho", "chahte hain",
+        "chahte hoon", "chahte ho", "chahte hain", "chahte hoon", "chahte ho", "chahte hain", "chahte hoon", "chahte ho",
+        "chahte hain", "chahte hoon", "chahte ho", "chahte hain", "chahte hoon", "chahte ho", "chahte hain", "chahte hoon",
+        "chahte ho", "chahte hain", "chahte hoon", "chahte ho", "chahte hain", "chahte hoon", "chahte ho", "chahte hain",
+        # Popular Hindi singers
+        "arijit singh", "shreya ghoshal", "sonu nigam", "udit narayan", "alka yagnik", "kumar sanu", "kishore kumar",
+        "lata mangeshkar", "asha bhosle", "mohit chauhan", "jubin nautiyal", "neha kakkar", "badshah", "yo yo honey singh",
+        "atif aslam", "sunidhi chauhan", "palak muchhal", "kk", "rahat fateh ali khan", "shaan", "ankit tiwari",
+        # Bollywood movie names (partial)
+        "dilwale", "kabir singh", "shershaah", "yeh jawaani hai deewani", "kal ho naa ho", "dil chahta hai", "barfi",
+        "tamasha", "rockstar", "aashiqui", "aashiqui 2", "baazigar", "dangal", "lagaan", "chak de india", "kabhi khushi kabhie gham",
+        "kuch kuch hota hai", "hum aapke hain koun", "hum dil de chuke sanam", "devdas", "veer-zaara", "jab we met", "zindagi na milegi dobara"
+    ]
+french_keywords = [
+        # Common French words
+        "je", "le", "la", "français", "amour", "paris", "france", "toi", "moi", "nous", "vous", "ils", "elles", "être",
+        "avoir", "faire", "dire", "pouvoir", "aller", "voir", "vouloir", "venir", "devoir", "prendre", "trouver", "donner",
+        "parler", "aimer", "chanter", "chanson", "musique", "paroles", "coeur", "fleur", "soleil", "lune", "nuit", "jour",
+        "rêve", "rêver", "baiser", "douce", "doucement", "beau", "belle", "joli", "jolie", "fille", "garçon", "femme", "homme",
+        "mon", "ma", "mes", "ton", "ta", "tes", "son", "sa", "ses", "notre", "votre", "leur", "leurs", "chérie", "chéri",
+        "mon amour", "ma vie", "mon coeur", "ma belle", "mon chéri", "ma chérie", "mon ange", "ma princesse", "mon prince",
+        # French singers
+        "edith piaf", "johnny hallyday", "mylene farmer", "francis cabrel", "charles aznavour", "stromaé", "indila", "zaz",
+        "patrick bruel", "julien doré", "louane", "vianney", "christophe mae", "claude françois", "louis bertignac",
+        # French song/album names
+        "la vie en rose", "ne me quitte pas", "je t'aime", "je te promets", "formidable", "papaoutai", "dernière danse",
+        "sous le vent", "elle me dit", "si jamais j'oublie", "parler à mon père", "on écrit sur les murs"
+    ]
+german_keywords = [
+        # Common German words
+        "liebe", "deutsch", "berlin", "german", "schatz", "lied", "herz", "leben", "träume", "nacht", "tag", "himmel",
+        "sonne", "mond", "sterne", "freund", "freundin", "mädchen", "junge", "frau", "mann", "mein", "meine", "dein",
+        "deine", "unser", "unsere", "euer", "eure", "ihr", "ihre", "ich", "du", "er", "sie", "es", "wir", "ihr", "sie",
+        "dich", "mich", "uns", "euch", "ihn", "sie", "es", "uns", "euch", "sie", "ihnen", "musik", "liedtext", "singen",
+        "sänger", "sängerin", "band", "album", "titel", "melodie", "refrain", "vers", "chor", "tanz", "party", "spaß",
+        # German singers/bands
+        "helene fischer", "udo lindenberg", "herbert grönemeyer", "nena", "tokio hotel", "cro", "mark forster", "sido",
+        "peter fox", "xavier naidoo", "andreas bourani", "revolverheld", "silbermond", "pur", "die toten hosen", "die ärzte",
+        # German song/album names
+        "atemlos durch die nacht", "99 luftballons", "männer", "auf uns", "tage wie diese", "ein hoch auf uns", "ich will nur",
+        "ich will", "ich liebe dich", "du bist mein", "mein herz brennt", "ich geh in flammen auf"
+    ]
+japanese_keywords = [
+        # Common Japanese words/phrases
+        "watashi", "anata", "nihon", "japan", "koi", "suki", "日本", "歌", "愛", "恋", "心", "夢", "夜", "日", "月", "星",
+        "空", "花", "桜", "涙", "友達", "友", "君", "僕", "私", "あなた", "彼", "彼女", "好き", "大好き", "愛してる", "会いたい",
+        "ありがとう", "さようなら", "おはよう", "こんばんは", "おやすみ", "歌詞", "音楽", "メロディー", "バンド", "シンガー", "アルバム",
+        "タイトル", "リフレイン", "サビ", "ダンス", "パーティー", "楽しい", "悲しい", "嬉しい", "切ない", "寂しい", "幸せ", "希望",
+        # Japanese singers/bands
+        "宇多田ヒカル", "浜崎あゆみ", "米津玄師", "中島美嘉", "嵐", "乃木坂46", "欅坂46", "perfume", "one ok rock", "bump of chicken",
+        "king gnu", "official髭男dism", "あいみょん", "back number", "yui", "lisa", "yoasobi", "aimyon", "utada hikaru", "kenshi yonezu",
+        # Japanese song/album names
+        "first love", "lemon", "pretender", "紅蓮華", "炎", "打上花火", "小さな恋のうた", "さくら", "ありがとう", "世界に一つだけの花"
+    ]
+english_keywords = [
+        # Common English words/phrases
+        "the", "love", "baby", "girl", "boy", "english", "heart", "music", "song", "you", "me", "us", "life", "dream",
+        "night", "day", "moon", "sun", "star", "sky", "friend", "friends", "dance", "party", "happy", "sad", "cry", "smile",
+        "kiss", "hug", "forever", "always", "never", "together", "apart", "alone", "miss", "missing", "remember", "forget",
+        "goodbye", "hello", "hi", "hey", "yeah", "oh", "yeah yeah", "oh oh", "la la", "na na", "chorus", "verse", "melody",
+        "lyrics", "band", "album", "track", "playlist", "single", "hit", "top", "chart", "radio", "remix", "cover", "original",
+        # English singers/bands
+        "taylor swift", "ed sheeran", "justin bieber", "ariana grande", "beyonce", "rihanna", "drake", "adele", "bruno mars",
+        "billie eilish", "dua lipa", "the weeknd", "shawn mendes", "lady gaga", "katy perry", "maroon 5", "coldplay", "eminem",
+        "post malone", "selena gomez", "harry styles", "olivia rodrigo", "sam smith", "sia", "imagine dragons", "one direction",
+        # English song/album names
+        "shape of you", "blinding lights", "bad guy", "someone like you", "hello", "rolling in the deep", "love story", "perfect",
+        "thinking out loud", "all of me", "let her go", "see you again", "uptown funk", "closer", "faded", "cheap thrills"
+    ]
+
+# The keyword lists above are part of the classifier's training text (see _train_weights)
+LANGUAGES = ("hindi", "french", "japanese", "german", "english")
+
+
+# --- Character n-gram classifier ---------------------------------------------------------
+
+LANGUAGE_NGRAM_BUCKETS = int(os.getenv("LANGUAGE_NGRAM_BUCKETS", str(1 << 15)))
+LANGUAGE_MAX_CHARS = int(os.getenv("LANGUAGE_MAX_CHARS", "4000"))        # text looked at per item
+LANGUAGE_EVIDENCE_CAP = int(os.getenv("LANGUAGE_EVIDENCE_CAP", "30"))   # n-grams that count as full evidence
+LANGUAGE_MIN_NGRAMS = int(os.getenv("LANGUAGE_MIN_NGRAMS", "3"))
+LANGUAGE_MIN_CONFIDENCE = float(os.getenv("LANGUAGE_MIN_CONFIDENCE", "0.6"))  # below this a song is "unknown"
+LANGUAGE_TITLE_WEIGHT = float(os.getenv("LANGUAGE_TITLE_WEIGHT", "1"))   # title evidence relative to the (capped) description
+LANGUAGE_BATCH_SIZE = 64  # texts scored per matrix product (bounds the dense count matrix to ~8 MB)
+
+# Short reference passages (native script and the romanized forms used in song titles)
+# that, together with the keyword lists, train the n-gram weights at import time
+SEED_TEXTS = {
+    "hindi": """
+        मैं तुमसे बहुत प्यार करता हूँ और तुम्हारे बिना मेरा दिल नहीं लगता है। यह गाना दिल को छू लेने वाला है
+        और इसकी धुन बहुत सुंदर है। रात लंबी है और चाँद आसमान में चमक रहा है। हम साथ रहेंगे हमेशा।
+        main tumse bahut pyar karta hoon aur tumhare bina mera dil nahi lagta hai. yeh gaana dil ko chhoo
+        lene wala hai aur iski dhun bahut sundar hai. raat lambi hai aur chaand aasman mein chamak raha hai.
+        tere bina jeena nahi, tujhe dekh ke dil dhadakta hai, kya hua tujhko, kyun door hai tu mujhse.
+        naya gaana sunein, lyrics ke saath, film ke is romantic gaane mein pyaar aur judaai ki kahani hai.
+    """,
+    "french": """
+        je t'aime plus que tout et sans toi ma vie n'a pas de sens. cette chanson parle d'amour et de la
+        nuit qui tombe sur paris. nous chantons ensemble sous le soleil et les étoiles du ciel. elle est
+        belle comme une fleur au printemps et mon coeur bat pour elle. c'est une chanson douce que je te
+        chante, les paroles sont écrites pour toi. le clip officiel de la nouvelle chanson est disponible
+        maintenant, avec les paroles et la musique de l'album. quand je pense à toi, je rêve encore.
+    """,
+    "japanese": """
+        君のことが大好きです。この歌は夜空の星と桜の花について歌っています。あなたに会いたい、
+        ずっとそばにいてほしい。涙がこぼれても、明日はきっと晴れるよ。新しいアルバムの公式ミュージックビデオです。
+        kimi no koto ga daisuki desu. kono uta wa yozora no hoshi to sakura no hana ni tsuite utatte imasu.
+        anata ni aitai, zutto soba ni ite hoshii. namida ga koborete mo ashita wa kitto hareru yo.
+        kokoro no naka de yume wo miteru, watashi no koi wa owaranai.
+    """,
+    "german": """
+        ich liebe dich mehr als alles andere und ohne dich ist mein leben leer. dieses lied handelt von
+        der liebe und der nacht in berlin. wir singen zusammen unter der sonne und den sternen am himmel.
+        sie ist schön wie eine blume im frühling und mein herz schlägt für sie. das ist ein schönes lied,
+        der text ist für dich geschrieben. das offizielle musikvideo zum neuen song ist jetzt verfügbar,
+        mit dem songtext und der musik aus dem album. wenn ich an dich denke, träume ich noch immer.
+    """,
+    "english": """
+        i love you more than anything and without you my life has no meaning. this song is about love
+        and the night that falls over the city. we sing together under the sun and the stars in the sky.
+        she is beautiful like a flower in spring and my heart beats for her. this is a gentle song that i
+        sing for you, the lyrics were written for you. the official music video for the new single is out
+        now, with lyrics and music from the album. when i think of you, i am still dreaming.
+    """,
+}
+
+# Passages in languages we don't support but that share the Latin alphabet with the ones we
+# do; they train an extra "other" class so such songs come out "unknown" instead of French
+OTHER_TEXTS = """
+    te quiero más que a nada y sin ti mi vida no tiene sentido. esta canción habla del amor y de la
+    noche que cae sobre la ciudad. cantamos juntos bajo el sol y las estrellas del cielo. el video
+    oficial de la nueva canción ya está disponible, con la letra y la música del álbum.
+    ti amo più di ogni altra cosa e senza di te la mia vita non ha senso. questa canzone parla
+    dell'amore e della notte che scende sulla città. cantiamo insieme sotto il sole e le stelle del
+    cielo. il video ufficiale della nuova canzone è disponibile adesso, con il testo e la musica.
+    una canzone italiana famosa nel mondo, cantata dal vivo con gli amici di sempre, piena di gioia e di speranza.
+    eu te amo mais do que tudo e sem você a minha vida não tem sentido. esta canção fala do amor e da
+    noite que cai sobre a cidade. cantamos juntos sob o sol e as estrelas do céu. o clipe oficial da
+    nova música já está disponível, com a letra e a música do álbum. que saudade de você, meu bem,
+    não posso viver sem o seu carinho, essa é uma canção brasileira cheia de graça e de paixão.
+"""
+
+# Characters that on their own point at one language: (first, last code point, language, weight per char)
+SCRIPT_RANGES = [
+    (0x0900, 0x097F, "hindi", 6.0),      # Devanagari
+    (0x3040, 0x30FF, "japanese", 6.0),   # Hiragana, Katakana
+    (0x31F0, 0x31FF, "japanese", 6.0),   # Katakana extensions
+    (0x3400, 0x4DBF, "japanese", 6.0),   # CJK extension A
+    (0x4E00, 0x9FFF, "japanese", 6.0),   # CJK unified ideographs
+    (0x0400, 0x04FF, "other", 6.0),      # Cyrillic
+    (0x0600, 0x06FF, "other", 6.0),      # Arabic
+    (0x0980, 0x0DFF, "other", 6.0),      # Bengali ... Sinhala (other Indic scripts)
+    (0x0E00, 0x0E7F, "other", 6.0),      # Thai
+    (0x1100, 0x11FF, "other", 6.0),      # Hangul jamo
+    (0xAC00, 0xD7AF, "other", 6.0),      # Hangul syllables
+]
+SCRIPT_CHARACTERS = [("äöß", "german", 2.0), ("àâçéèêëîïôœùûÿ", "french", 2.0), ("ñ¡¿ãõìò", "other", 2.0)]
+
+# Classes the model scores: the supported languages plus "other", reported as "unknown"
+_CLASSES = LANGUAGES + ("other",)
+
+# Field labels our own extractors put into website_data content; they are English for every item
+_CONTENT_LABELS = re.compile(
+    r'\b(?:Title|Artist|Album|Released|Channel|Description|Video Details|Duration|Views|Published|'
+    r'Topics/Tags|Referenced Links|Video Content Sample|Viewer Comments Sample):'
+)
+
+# Everything but letters and combining marks (Devanagari vowel signs must stay attached)
+_NON_LETTERS = re.compile(r"[\s\d!-/:-@\[-`{-~\u00a0-\u00bf\u2000-\u206f\u3000-\u303f\uff01-\uff20]+")
+_PRIME = np.uint64(1_000_003)
+_SALTS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F), np.uint64(0x165667B19E3779F9))
+
+
+def _normalize(text):
+    return ' ' + _NON_LETTERS.sub(' ', text[:LANGUAGE_MAX_CHARS].lower()).strip() + ' '
+
+
+def _code_points(text):
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+
+def _ngram_ids(codes):
+    """Hashed ids of all character 1-, 2- and 3-grams of a normalized text's code points"""
+    if len(codes) <= 2:  # just the padding
+        return np.empty(0, dtype=np.int64)
+    grams = [codes, codes[:-1] * _PRIME + codes[1:]]
+    grams.append(grams[1][:-1] * _PRIME + codes[2:])
+    buckets = np.uint64(LANGUAGE_NGRAM_BUCKETS)
+    return np.concatenate([(gram * salt) % buckets for gram, salt in zip(grams, _SALTS)]).astype(np.int64)
+
+
+def _script_counts(codes):
+    """Characters per SCRIPT_RANGES / SCRIPT_CHARACTERS entry"""
+    counts = [np.count_nonzero((codes >= first) & (codes <= last)) for first, last, _, _ in SCRIPT_RANGES]
+    counts += [np.count_nonzero(np.isin(codes, _SCRIPT_CHARACTER_CODES[i])) for i in range(len(SCRIPT_CHARACTERS))]
+    return counts
+
+
+_SCRIPT_CHARACTER_CODES = [_code_points(chars) for chars, _, _ in SCRIPT_CHARACTERS]
+
+
+def _train_weights():
+    """Multinomial naive Bayes log-likelihoods, one column per class"""
+    counts = np.zeros((LANGUAGE_NGRAM_BUCKETS, len(_CLASSES)))
+    corpora = {language: (SEED_TEXTS[language], ' '.join(dict.fromkeys(keywords)))
+               for language, keywords in zip(LANGUAGES, (hindi_keywords, french_keywords, japanese_keywords,
+                                                         german_keywords, english_keywords))}
+    corpora["other"] = (OTHER_TEXTS,)
+    for column, language in enumerate(_CLASSES):
+        for text in corpora[language]:
+            ids = _ngram_ids(_code_points(_normalize(text)))
+            counts[:, column] += np.bincount(ids, minlength=LANGUAGE_NGRAM_BUCKETS)
+    # Smoothing proportional to each language's corpus size, so n-grams no seed contains
+    # score the same for every language instead of favouring the smallest corpus
+    totals = counts.sum(axis=0)
+    weights = np.log((counts + totals / LANGUAGE_NGRAM_BUCKETS) / (2 * totals))
+    # Only differences between languages matter; centering keeps the scores small
+    return (weights - weights.mean(axis=1, keepdims=True)).astype(np.float32)
+
+
+def _script_weights():
+    rows = [(language, weight) for _, _, language, weight in SCRIPT_RANGES]
+    rows += [(language, weight) for _, language, weight in SCRIPT_CHARACTERS]
+    weights = np.zeros((len(rows), len(_CLASSES)), dtype=np.float32)
+    for row, (language, weight) in enumerate(rows):
+        weights[row, _CLASSES.index(language)] = weight
+    return weights
+
+
+LANGUAGE_WEIGHTS = _train_weights()   # (n-gram bucket x class)
+SCRIPT_WEIGHTS = _script_weights()     # (script feature x class)
+
+
+def _rank(scores, ngram_count):
+    if ngram_count < LANGUAGE_MIN_NGRAMS:
+        return [("unknown", 0.0)]
+    probabilities = np.exp(scores - scores.max())
+    probabilities /= probabilities.sum()
+    order = np.argsort(-probabilities)
+    return [(LANGUAGES[i] if i < len(LANGUAGES) else "unknown", round(float(probabilities[i]), 4)) for i in order]
+
+
+def _score_batch(texts):
+    """Evidence per class for each text, plus the number of n-grams it is based on"""
+    codes = [_code_points(_normalize(text or '')) for text in texts]
+    ids = [_ngram_ids(c) for c in codes]
+    lengths = np.array([len(i) for i in ids], dtype=np.int64)
+    owners = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+    # (text x n-gram bucket) counts, then one product with each weight matrix
+    ngram_counts = np.bincount(owners * LANGUAGE_NGRAM_BUCKETS + np.concatenate(ids + [np.empty(0, np.int64)]),
+                               minlength=len(texts) * LANGUAGE_NGRAM_BUCKETS)
+    ngram_counts = ngram_counts.reshape(len(texts), LANGUAGE_NGRAM_BUCKETS).astype(np.float32)
+    script_counts = np.array([_script_counts(c) for c in codes], dtype=np.float32).reshape(len(texts), -1)
+    # Naive Bayes scores grow with text length; cap the n-gram evidence so confidence stays
+    # meaningful. Script characters are added after the cap: a few Devanagari or kana
+    # characters are decisive however much Latin text surrounds them.
+    scale = np.minimum(1.0, LANGUAGE_EVIDENCE_CAP / np.maximum(lengths, 1)).astype(np.float32)[:, None]
+    scores = (ngram_counts @ LANGUAGE_WEIGHTS) * scale
+    scores += np.minimum(script_counts, LANGUAGE_EVIDENCE_CAP) @ SCRIPT_WEIGHTS
+    return scores, lengths
+
+
+def _batched_scores(texts):
+    for start in range(0, len(texts), LANGUAGE_BATCH_SIZE):
+        yield from zip(*_score_batch(texts[start:start + LANGUAGE_BATCH_SIZE]))
+
+
+def classify_language_batch(texts):
+    """Rank the supported languages for many texts with vectorized scoring.
+
+    Returns one list of (language, confidence) pairs per text, best first. "unknown" in the
+    ranking stands for an unsupported language; texts with too little letter content get
+    [("unknown", 0.0)].
+    """
+    return [_rank(scores, int(length)) for scores, length in _batched_scores(texts)]
+
+
+def classify_language(text):
+    """Ranked (language, confidence) pairs for one text"""
+    return classify_language_batch([text])[0]
+
+
+# Path segments that say what kind of page a URL is, not what the song is called
+_URL_WORDS = {
+    "watch", "shorts", "embed", "track", "album", "playlist", "artist", "song", "songs", "lyrics", "music",
+    "video", "videos", "channel", "user", "search", "results", "intl", "index", "html", "htm", "php", "aspx", "amp",
+}
+_URL_SEPARATORS = re.compile(r"[/\-_.+~,;=\s]+")
+
+
+def url_words(url):
+    """Human-readable slug words of a URL path (e.g. /song/raataan-lambiyan/Ry4DfTJDY1s -> raataan lambiyan).
+
+    The query and anything that looks like an ID (digits, mixed case) are left out: hashing
+    random IDs into n-grams only adds noise that the classifier reads as some language.
+    """
+    words = []
+    for token in _URL_SEPARATORS.split(unquote(urlparse(url or '').path)):
+        if len(token) >= 3 and token.isalpha() and (token.islower() or token.istitle() or not token.isascii()) \
+                and token.lower() not in _URL_WORDS:
+            words.append(token)
+    return ' '.join(words)
+
+
+def song_text(content, url, title):
+    """The text a song is classified on: title, content and the slug words of the URL"""
+    return _CONTENT_LABELS.sub(' ', f"{title} {content} {url_words(url)}")
+
+
+def classify_song_batch(songs):
+    """Ranked (language, confidence) pairs for many (content, url, title) songs.
+
+    The title is scored on its own, with its own evidence cap, and added with weight
+    LANGUAGE_TITLE_WEIGHT, so a long English description or extractor boilerplate doesn't
+    outvote a Hindi or Japanese title.
+    """
+    texts = []
+    for content, url, title in songs:
+        texts += [_CONTENT_LABELS.sub(' ', title or ''), song_text(content, url, '')]
+    scored = list(_batched_scores(texts))
+    results = []
+    for (title_scores, title_length), (body_scores, body_length) in zip(scored[::2], scored[1::2]):
+        results.append(_rank(LANGUAGE_TITLE_WEIGHT * title_scores + body_scores, int(title_length + body_length)))
+    return results
+
+
+def classify_song(content, url, title):
+    """Ranked (language, confidence) pairs for one song"""
+    return classify_song_batch([(content, url, title)])[0]
+
+
+# --- Detection memo ----------------------------------------------------------------------
+
+LANGUAGE_CACHE_MAX_BYTES = int(os.getenv("LANGUAGE_CACHE_MAX_BYTES", str(1024 * 1024)))
+LANGUAGE_CACHE_TTL = int(os.getenv("LANGUAGE_CACHE_TTL", "86400"))
+
+# URL or title words that mark a song/music link
+SONG_LINK_KEYWORDS = [
+    "spotify", "youtube", "youtu.be", "song", "lyrics", "music", "album", "track", "playlist", "गीत", "गाना"
+]
+
+_language_cache = MemoryLRUTier(LANGUAGE_CACHE_MAX_BYTES)
+_language_stats_lock = threading.Lock()
+_language_stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+
+def _count(counter):
+    with _language_stats_lock:
+        _language_stats[counter] += 1
+
+
+def song_fingerprint(content, url, title):
+    """Fast 128-bit hash of the inputs of detect_song_language"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (content, url, title):
+        digest.update((part or '').encode('utf-8', 'surrogatepass'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def is_song_link(url, title):
+    """True if the URL or title suggests a song/music link"""
+    url, title = (url or '').lower(), (title or '').lower()
+    return any(kw in url for kw in SONG_LINK_KEYWORDS) or any(kw in title for kw in SONG_LINK_KEYWORDS)
+
+
+# Function to detect the language of a song based on its content, URL, and title
+def detect_song_language(content, url, title):
+    """Most likely language of a song; "unknown" when there is no usable text, the song is in
+    an unsupported language, or the best language is below LANGUAGE_MIN_CONFIDENCE.
+
+    Results are memoized by a fingerprint of (content, url, title) in a bounded LRU, since
+    the same descriptions and titles come through again and again.
+    """
+    key = song_fingerprint(content, url, title)
+    language = _language_cache.get(key)
+    if language is not None:
+        _count('hits')
+        return language
+    _count('misses')
+    language, confidence = classify_song(content, url, title)[0]
+    if confidence < LANGUAGE_MIN_CONFIDENCE:
+        language = "unknown"
+    _language_cache.set(key, language, LANGUAGE_CACHE_TTL, size=len(key) + len(language) + 64)
+    return language
+
+
+def annotate_song_language(data):
+    """Store the detected language in a song's website_data before it goes into the content cache"""
+    if data and 'song_language' not in data and is_song_link(data.get('url', ''), data.get('title', '')):
+        data['song_language'] = detect_song_language(data.get('content', ''), data.get('url', ''),
+                                                     data.get('title', ''))
+    return data
+
+
+def website_song_language(website_data):
+    """Song language of website_data: the one stored with it if present, otherwise detected"""
+    language = website_data.get('song_language')
+    if language:
+        _count('stored')
+        return language
+    return detect_song_language(website_data.get('content', ''), website_data.get('url', ''),
+                                website_data.get('title', ''))
+
+
+def language_cache_stats():
+    with _language_stats_lock:
+        stats = dict(_language_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    # Share of song requests answered without running detection at all
+    requests = stats['stored'] + lookups
+    stats['skip_rate'] = (stats['stored'] + stats['hits']) / requests if requests else 0.0
+    stats['memo'] = _language_cache.stats()
+    return stats
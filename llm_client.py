@@ -0,0 +1,313 @@
+import os
+import math
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from executors import run_blocking
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # gemini | stub
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+# Use the library's asyncio transport; with 0 every generation runs on the 'llm' executor instead
+LLM_ASYNC_TRANSPORT = os.getenv("LLM_ASYNC_TRANSPORT", "1") != "0"
+
+# Local stub provider for load tests (no network, no quota)
+LLM_STUB_LATENCY = os.getenv("LLM_STUB_LATENCY", "lognormal")             # fixed | uniform | exponential | lognormal
+LLM_STUB_LATENCY_MEAN = float(os.getenv("LLM_STUB_LATENCY_MEAN", "0.8"))      # seconds
+LLM_STUB_LATENCY_SPREAD = float(os.getenv("LLM_STUB_LATENCY_SPREAD", "0.5"))  # uniform: +/- share of the mean; lognormal: sigma
+LLM_STUB_ERROR_RATE = float(os.getenv("LLM_STUB_ERROR_RATE", "0"))
+LLM_STUB_TOKENS = int(os.getenv("LLM_STUB_TOKENS", "60"))                # output tokens, capped by max_tokens
+LLM_STUB_SEED = os.getenv("LLM_STUB_SEED", "")                            # makes the latency/error sequence reproducible
+
+
+class LLMError(Exception):
+    """A generation failed at the provider (quota, overload, ...)"""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LLMProvider:
+    """Interface of an LLM backend plus the call accounting every backend shares.
+
+    Subclasses implement `_generate` (blocking) and may override `_generate_async` and
+    `_stream_async`; by default those run `_generate` on the 'llm' executor.
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._counters = {'calls': 0, 'errors': 0, 'in_flight': 0}
+        self._total_seconds = 0.0
+
+    def configure(self):
+        """One-time setup (called at startup); idempotent"""
+
+    def _generate(self, prompt, max_tokens):
+        raise NotImplementedError
+
+    async def _generate_async(self, prompt, max_tokens):
+        return await run_blocking('llm', self._generate, prompt, max_tokens)
+
+    async def _stream_async(self, prompt, max_tokens):
+        yield await self._generate_async(prompt, max_tokens)
+
+    def _begin(self):
+        with self._stats_lock:
+            self._counters['calls'] += 1
+            self._counters['in_flight'] += 1
+        return time.monotonic()
+
+    def _end(self, started, ok):
+        with self._stats_lock:
+            self._counters['in_flight'] -= 1
+            if not ok:
+                self._counters['errors'] += 1
+            self._total_seconds += time.monotonic() - started
+
+    def generate(self, prompt, max_tokens=300):
+        """Blocking generation; returns the stripped response text"""
+        self.configure()
+        started = self._begin()
+        ok = False
+        try:
+            text = self._generate(prompt, max_tokens).strip()
+            ok = True
+            return text
+        finally:
+            self._end(started, ok)
+
+    async def generate_async(self, prompt, max_tokens=300):
+        """Generation that can be awaited from the event loop"""
+        self.configure()
+        started = self._begin()
+        ok = False
+        try:
+            text = (await self._generate_async(prompt, max_tokens)).strip()
+            ok = True
+            return text
+        finally:
+            self._end(started, ok)
+
+    async def stream_async(self, prompt, max_tokens=300):
+        """Yield response text chunks as the provider produces them"""
+        self.configure()
+        started = self._begin()
+        ok = False
+        try:
+            async for text in self._stream_async(prompt, max_tokens):
+                if text:
+                    yield text
+            ok = True
+        finally:
+            self._end(started, ok)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._counters)
+            total_seconds = self._total_seconds
+        finished = stats['calls'] - stats['in_flight']
+        stats['avg_seconds'] = round(total_seconds / finished, 3) if finished else 0.0
+        stats['provider'] = self.name
+        return stats
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini access configured once per process.
+
+    `genai.configure` runs and the GenerativeModel is built on first use; afterwards every
+    generation reuses the model and its transport, and per-call generation configs are cached
+    by max_tokens. The async paths await the library's asyncio API so concurrent generations
+    never hold the event loop (or an executor thread) while waiting on the network.
+    """
+
+    name = 'gemini'
+
+    def __init__(self, model_name=GEMINI_MODEL, temperature=LLM_TEMPERATURE, async_transport=LLM_ASYNC_TRANSPORT):
+        super().__init__()
+        self.model_name = model_name
+        self.temperature = temperature
+        self.async_transport = async_transport
+        self._genai = None
+        self._model = None
+        self._configs = {}
+        self._lock = threading.Lock()
+
+    def configure(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise Exception("GEMINI_API_KEY environment variable is not set")
+                genai.configure(api_key=api_key)
+                self._genai = genai
+                self._model = genai.GenerativeModel(self.model_name)
+                print(f"🤖 Gemini client ready ({self.model_name})")
+        return self._model
+
+    def _generation_config(self, max_tokens):
+        config = self._configs.get(max_tokens)
+        if config is None:
+            config = self._genai.types.GenerationConfig(max_output_tokens=max_tokens, temperature=self.temperature)
+            self._configs[max_tokens] = config
+        return config
+
+    def _use_async_transport(self):
+        return self.async_transport and hasattr(self._model, 'generate_content_async')
+
+    def _generate(self, prompt, max_tokens):
+        response = self._model.generate_content(prompt, generation_config=self._generation_config(max_tokens))
+        return response.text
+
+    async def _generate_async(self, prompt, max_tokens):
+        if not self._use_async_transport():
+            return await super()._generate_async(prompt, max_tokens)
+        response = await self._model.generate_content_async(prompt, generation_config=self._generation_config(max_tokens))
+        return response.text
+
+    async def _stream_async(self, prompt, max_tokens):
+        if not self._use_async_transport():
+            # Without the asyncio transport the full response comes as a single chunk
+            yield await super()._generate_async(prompt, max_tokens)
+            return
+        response = await self._model.generate_content_async(
+            prompt, generation_config=self._generation_config(max_tokens), stream=True
+        )
+        async for chunk in response:
+            yield chunk.text
+
+    def stats(self):
+        stats = super().stats()
+        stats['model'] = self.model_name
+        stats['configured'] = self._model is not None
+        return stats
+
+
+_STUB_WORDS = (
+    "the song feels warm and bright with a gentle melody that carries a story of love distance hope "
+    "and quiet nights under the city lights while the chorus lifts every line into something you can "
+    "hum along to long after it ends"
+).split()
+
+
+class StubProvider(LLMProvider):
+    """Local stand-in for load tests: no network, configurable latency, errors and output size.
+
+    The text is a deterministic function of the prompt (three sentences of filler words), so
+    summaries stay cacheable; latencies and injected errors come from one RNG that
+    LLM_STUB_SEED makes reproducible. Streaming spreads the latency over the tokens.
+    """
+
+    name = 'stub'
+
+    def __init__(self, latency=LLM_STUB_LATENCY, mean=LLM_STUB_LATENCY_MEAN, spread=LLM_STUB_LATENCY_SPREAD,
+                 error_rate=LLM_STUB_ERROR_RATE, tokens=LLM_STUB_TOKENS, seed=LLM_STUB_SEED):
+        super().__init__()
+        if latency not in ('fixed', 'uniform', 'exponential', 'lognormal'):
+            raise ValueError(f"Unknown stub latency distribution: {latency}")
+        self.latency = latency
+        self.mean = mean
+        self.spread = spread
+        self.error_rate = error_rate
+        self.tokens = tokens
+        self._rng = random.Random(seed or None)
+        self._rng_lock = threading.Lock()
+
+    def _sample(self):
+        """(latency in seconds, whether this call fails)"""
+        with self._rng_lock:
+            if self.mean <= 0 or self.latency == 'fixed':
+                latency = self.mean
+            elif self.latency == 'uniform':
+                latency = self._rng.uniform(self.mean * (1 - self.spread), self.mean * (1 + self.spread))
+            elif self.latency == 'exponential':
+                latency = self._rng.expovariate(1 / self.mean)
+            else:
+                # mu chosen so that the distribution's mean is `mean`; sigma controls the tail
+                latency = self._rng.lognormvariate(math.log(self.mean) - self.spread ** 2 / 2, self.spread)
+            failed = self._rng.random() < self.error_rate
+        return max(0.0, latency), failed
+
+    def _tokens(self, prompt, max_tokens):
+        """Deterministic filler for a prompt: word tokens forming three sentences"""
+        count = max(3, min(self.tokens, max_tokens))
+        rng = random.Random(hashlib.blake2b(prompt.encode('utf-8', 'surrogatepass'), digest_size=8).digest())
+        ends = {count // 3 - 1, 2 * count // 3 - 1, count - 1}
+        tokens = []
+        for i in range(count):
+            word = rng.choice(_STUB_WORDS)
+            if i == 0 or i - 1 in ends:
+                word = word.capitalize()
+            if i == count - 1:
+                word += '.'
+            elif i in ends:
+                word += '.\n'
+            else:
+                word += ' '
+            tokens.append(word)
+        return tokens
+
+    @staticmethod
+    def _error():
+        return LLMError("Stub provider: simulated overload", status=503, retry_after=1.0)
+
+    def _generate(self, prompt, max_tokens):
+        latency, failed = self._sample()
+        time.sleep(latency)
+        if failed:
+            raise self._error()
+        return ''.join(self._tokens(prompt, max_tokens))
+
+    async def _generate_async(self, prompt, max_tokens):
+        latency, failed = self._sample()
+        await asyncio.sleep(latency)
+        if failed:
+            raise self._error()
+        return ''.join(self._tokens(prompt, max_tokens))
+
+    async def _stream_async(self, prompt, max_tokens):
+        latency, failed = self._sample()
+        tokens = self._tokens(prompt, max_tokens)
+        # A fifth of the latency before the first token, the rest spread over the tokens
+        await asyncio.sleep(latency * 0.2)
+        if failed:
+            raise self._error()
+        step = latency * 0.8 / len(tokens)
+        for token in tokens:
+            yield token
+            await asyncio.sleep(step)
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(latency=self.latency, latency_mean=self.mean, error_rate=self.error_rate, tokens=self.tokens)
+        return stats
+
+
+PROVIDERS = {
+    'gemini': GeminiProvider,
+    'stub': StubProvider,
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the process-wide LLM provider selected by LLM_PROVIDER"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if LLM_PROVIDER not in PROVIDERS:
+                raise ValueError(f"Unknown LLM_PROVIDER: {LLM_PROVIDER} (expected one of {', '.join(PROVIDERS)})")
+            _client = PROVIDERS[LLM_PROVIDER]()
+            print(f"🤖 LLM provider: {_client.name}")
+        return _client
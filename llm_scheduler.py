@@ -0,0 +1,356 @@
+import os
+import re
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import threading
+from collections import deque
+from llm_client import get_llm_client, LLMError
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))  # 0 disables the token budget
+LLM_QUEUE_DEADLINE = float(os.getenv("LLM_QUEUE_DEADLINE", "10"))   # seconds a request may wait for a slot
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "256"))              # waiting requests before new ones are refused
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE = float(os.getenv("LLM_RETRY_BASE", "0.5"))          # seconds, doubled per attempt
+LLM_RETRY_MAX = float(os.getenv("LLM_RETRY_MAX", "8"))
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# HTTP statuses / gRPC codes worth another attempt (rate limited, overloaded, transient)
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = {'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable', 'InternalServerError',
+                    'DeadlineExceeded', 'GatewayTimeout', 'BadGateway'}
+_RETRY_IN = re.compile(r'retry in ([\d.]+)\s*s', re.IGNORECASE)
+
+
+class LLMRejected(LLMError):
+    """Refused without calling the provider: the queue is full or the wait passed the deadline"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message, status='overloaded', retry_after=retry_after)
+
+
+def is_retryable(error):
+    if isinstance(error, LLMRejected):
+        return False
+    status = getattr(error, 'status', None) or getattr(error, 'code', None)
+    if isinstance(status, int) and status in _RETRYABLE_STATUSES:
+        return True
+    return type(error).__name__ in _RETRYABLE_NAMES or isinstance(error, (asyncio.TimeoutError, ConnectionError))
+
+
+def retry_after_hint(error):
+    """Seconds the provider asked us to wait, from an attribute, RetryInfo details or the message"""
+    hint = getattr(error, 'retry_after', None)
+    if hint is not None:
+        return float(hint)
+    for detail in getattr(error, 'details', None) or ():
+        delay = getattr(detail, 'retry_delay', None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+    match = _RETRY_IN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def as_llm_error(error):
+    """Retryable provider errors (e.g. google.api_core ResourceExhausted) as LLMError once retries are spent"""
+    if isinstance(error, LLMError) or not is_retryable(error):
+        return error
+    status = getattr(error, 'code', None)
+    wrapped = LLMError(str(error), status=status if isinstance(status, int) else None,
+                       retry_after=retry_after_hint(error))
+    wrapped.__cause__ = error
+    return wrapped
+
+
+def estimate_tokens(prompt, max_tokens):
+    """Rough token cost of a call: ~4 characters per prompt token plus the full output allowance"""
+    return len(prompt) // 4 + max_tokens
+
+
+class LLMScheduler:
+    """Admission control in front of the LLM provider.
+
+    At most `max_concurrency` generations run at once, and their estimated tokens over the
+    last minute stay within `tokens_per_minute`. Everything else waits in a priority queue
+    (interactive before batch, FIFO within a priority); a request that cannot start within
+    `queue_deadline` seconds, or that finds `max_queue` requests already waiting, is refused
+    with LLMRejected right away instead of piling up. Rate-limit and overload errors are
+    retried with full-jitter exponential backoff, never sooner than a retry-after hint.
+
+    Blocking callers on executor threads (`generate`) share the same slots and token window;
+    they wait on a condition variable instead of the async queue, so state is lock-guarded.
+    """
+
+    def __init__(self, provider=None, max_concurrency=LLM_MAX_CONCURRENCY, tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 queue_deadline=LLM_QUEUE_DEADLINE, max_queue=LLM_MAX_QUEUE, max_retries=LLM_MAX_RETRIES,
+                 retry_base=LLM_RETRY_BASE, retry_max=LLM_RETRY_MAX):
+        self._provider = provider
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.queue_deadline = queue_deadline
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._queue = []          # heap of [priority, seq, future, tokens]
+        self._sequence = itertools.count()
+        self._active = 0
+        self._waiting = 0         # live (not granted, not given up) entries of the async queue
+        self._blocking_waiting = 0
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._loop = None         # event loop of the async queue, for releases from worker threads
+        self._window = deque()    # (granted_at, tokens) for the last 60 s
+        self._window_tokens = 0
+        self._wakeup = None       # timer re-running dispatch when the token window frees up
+        self._waits = deque(maxlen=500)
+        self._counters = {'granted': 0, 'rejected_queue_full': 0, 'rejected_deadline': 0,
+                          'retries': 0, 'failures': 0}
+
+    @property
+    def provider(self):
+        return self._provider or get_llm_client()
+
+    # --- admission -----------------------------------------------------------------------
+
+    def _trim_window(self, now):
+        while self._window and self._window[0][0] <= now - 60:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _fits_budget(self, tokens, now):
+        if not self.tokens_per_minute:
+            return True
+        self._trim_window(now)
+        # A single call larger than the whole budget may still run once the window is empty
+        return self._window_tokens + tokens <= self.tokens_per_minute or not self._window
+
+    def _dispatch(self):
+        """Start queued requests while slots and token budget allow (on the event loop)"""
+        now = time.monotonic()
+        with self._lock:
+            while self._queue and self._active < self.max_concurrency:
+                _, _, future, tokens = self._queue[0]
+                if future.done():  # timed out or cancelled while waiting
+                    heapq.heappop(self._queue)
+                    continue
+                if not self._fits_budget(tokens, now):
+                    if self._wakeup is None:
+                        delay = max(0.0, self._window[0][0] + 60 - now)
+                        self._wakeup = asyncio.get_running_loop().call_later(delay, self._on_wakeup)
+                    return
+                heapq.heappop(self._queue)
+                self._waiting -= 1
+                self._grant(tokens, now)
+                future.set_result(None)
+
+    def _on_wakeup(self):
+        self._wakeup = None
+        self._dispatch()
+
+    def _grant(self, tokens, now):
+        self._active += 1
+        self._counters['granted'] += 1
+        if self.tokens_per_minute:
+            self._window.append((now, tokens))
+            self._window_tokens += tokens
+
+    def _reject_if_full(self):
+        waiting = self._waiting + self._blocking_waiting
+        if waiting >= self.max_queue:
+            self._counters['rejected_queue_full'] += 1
+            raise LLMRejected(f"LLM queue full ({waiting} waiting)", retry_after=self.queue_deadline)
+
+    def _give_up(self, future):
+        """Withdraw a queued request that timed out or whose caller went away"""
+        with self._lock:
+            if future.done():
+                return False
+            future.cancel()
+            self._waiting -= 1
+            return True
+
+    async def _acquire(self, priority, tokens):
+        now = time.monotonic()
+        self._loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiting and self._active < self.max_concurrency and self._fits_budget(tokens, now):
+                self._grant(tokens, now)
+                self._waits.append(0.0)
+                return
+            self._reject_if_full()
+            future = self._loop.create_future()
+            heapq.heappush(self._queue, [priority, next(self._sequence), future, tokens])
+            self._waiting += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_deadline)
+        except asyncio.TimeoutError:
+            if self._give_up(future):
+                self._counters['rejected_deadline'] += 1
+                self._waits.append(time.monotonic() - now)
+                raise LLMRejected(f"LLM queue wait exceeded {self.queue_deadline:g}s",
+                                  retry_after=self.queue_deadline) from None
+        except asyncio.CancelledError:
+            # The caller went away; give the slot back if it had already been granted
+            if not self._give_up(future) and not future.cancelled():
+                self._release()
+            raise
+        self._waits.append(time.monotonic() - now)
+
+    def _acquire_blocking(self, tokens):
+        """Wait on the calling thread for a slot and token budget, up to the queue deadline"""
+        started = time.monotonic()
+        deadline = started + self.queue_deadline
+        with self._lock:
+            if self._active >= self.max_concurrency or not self._fits_budget(tokens, started):
+                self._reject_if_full()
+            self._blocking_waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._active < self.max_concurrency and self._fits_budget(tokens, now):
+                        self._grant(tokens, now)
+                        self._waits.append(now - started)
+                        return
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._counters['rejected_deadline'] += 1
+                        self._waits.append(now - started)
+                        raise LLMRejected(f"LLM queue wait exceeded {self.queue_deadline:g}s",
+                                          retry_after=self.queue_deadline)
+                    if self._active < self.max_concurrency and self._window:
+                        # Only the token budget is short: wake up when the oldest grant leaves the window
+                        remaining = min(remaining, max(0.01, self._window[0][0] + 60 - now))
+                    self._slot_freed.wait(remaining)
+            finally:
+                self._blocking_waiting -= 1
+
+    def _release(self):
+        with self._lock:
+            self._active -= 1
+            self._slot_freed.notify_all()
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch()
+        else:
+            # Released from an executor thread; queued coroutines are started on their own loop
+            loop.call_soon_threadsafe(self._dispatch)
+
+    # --- retries -------------------------------------------------------------------------
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+        hint = retry_after_hint(error)
+        return max(delay, hint) if hint is not None else delay
+
+    async def _retry_wait(self, attempt, error):
+        if attempt >= self.max_retries or not is_retryable(error):
+            self._counters['failures'] += 1
+            return False
+        delay = self._backoff(attempt, error)
+        self._counters['retries'] += 1
+        print(f"🔁 LLM call failed ({type(error).__name__}: {error}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+        return True
+
+    async def generate_async(self, prompt, max_tokens=300, priority=PRIORITY_INTERACTIVE):
+        """provider.generate_async under the concurrency cap, token budget and retry policy"""
+        tokens = estimate_tokens(prompt, max_tokens)
+        for attempt in itertools.count():
+            await self._acquire(priority, tokens)
+            try:
+                return await self.provider.generate_async(prompt, max_tokens)
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            if not await self._retry_wait(attempt, error):
+                raise as_llm_error(error)
+
+    async def stream_async(self, prompt, max_tokens=300, priority=PRIORITY_INTERACTIVE):
+        """provider.stream_async under the same policy; retried only until the first chunk arrives"""
+        tokens = estimate_tokens(prompt, max_tokens)
+        for attempt in itertools.count():
+            await self._acquire(priority, tokens)
+            started = False
+            try:
+                async for text in self.provider.stream_async(prompt, max_tokens):
+                    started = True
+                    yield text
+                return
+            except Exception as e:
+                if started:
+                    self._counters['failures'] += 1
+                    raise as_llm_error(e)
+                error = e
+            finally:
+                self._release()
+            if not await self._retry_wait(attempt, error):
+                raise as_llm_error(error)
+
+    def generate(self, prompt, max_tokens=300):
+        """Blocking generation for executor threads under the same cap, token budget and retry policy"""
+        tokens = estimate_tokens(prompt, max_tokens)
+        for attempt in itertools.count():
+            self._acquire_blocking(tokens)
+            try:
+                return self.provider.generate(prompt, max_tokens)
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            if attempt >= self.max_retries or not is_retryable(error):
+                self._counters['failures'] += 1
+                raise as_llm_error(error)
+            delay = self._backoff(attempt, error)
+            self._counters['retries'] += 1
+            print(f"🔁 LLM call failed ({type(error).__name__}: {error}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            by_priority = {}
+            for priority, _, future, _ in self._queue:
+                if not future.done():
+                    by_priority[priority] = by_priority.get(priority, 0) + 1
+            self._trim_window(time.monotonic())
+            window_tokens = self._window_tokens
+            blocking_waiting = self._blocking_waiting
+        return dict(
+            self._counters,
+            active=self._active,
+            max_concurrency=self.max_concurrency,
+            queue_depth=sum(by_priority.values()),
+            queue_by_priority=by_priority,
+            blocking_waiting=blocking_waiting,
+            tokens_last_minute=window_tokens,
+            tokens_per_minute=self.tokens_per_minute,
+            wait_avg_seconds=round(sum(waits) / len(waits), 3) if waits else 0.0,
+            wait_p95_seconds=round(waits[min(len(waits) - 1, int(0.95 * len(waits)))], 3) if waits else 0.0,
+        )
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler():
+    """Return the process-wide LLM scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
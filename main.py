@@ -1,20 +1,32 @@
 
-import re
-import os
+import json
 import random
 from datetime import datetime
-from langdetect import detect, LangDetectException
 
 
-# Google Generative AI import (make sure google-generativeai is installed)
-import google.generativeai as genai
-
 # FastAPI app and request model
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Import helper functions from utils.py
-from utils import detect_urls_in_query, fetch_website_content, create_website_summary_response
+from utils import (
+    detect_urls_in_query, fetch_website_content_async, create_website_summary_response_async,
+    stream_website_summary_async, fetch_flight
+)
+from executors import shutdown_executors
+from driver_pool import get_driver_pool, close_driver_pool
+from page_wait import wait_stats
+from content_cache import get_content_cache, canonicalize_url
+from singleflight import SingleFlight
+from extractor_strategy import get_extractor_strategy
+from circuit_breaker import negative_cache, circuit_breakers
+from page_budget import page_memory
+from transcripts import transcript_cache_stats
+from llm_client import get_llm_client
+from llm_scheduler import get_llm_scheduler, LLMError
+from summary_cache import SummaryCache, cached_generation, stream_cached_generation, get_summary_cache
+from language_detection import is_song_link, website_song_language, language_cache_stats
 
 # Dummy BOT_LANGUAGE_MAP for demo (replace with your real mapping)
 BOT_LANGUAGE_MAP = {
@@ -29,6 +41,52 @@ BOT_LANGUAGE_MAP = {
 # FastAPI app instance
 app = FastAPI()
 
+# Identical concurrent (url, bot) summaries share one Gemini call
+summary_flight = SingleFlight('summary')
+
+# Bump when the song prompt in api_news changes so cached summaries are not reused
+SONG_PROMPT_VERSION = 'song-v1'
+SONG_SUMMARY_MAX_TOKENS = 180
+
+
+@app.on_event("startup")
+def _configure_llm():
+    # Configure the LLM provider once up front so the first request doesn't pay for it
+    try:
+        get_llm_client().configure()
+    except Exception as e:
+        print(f"⚠️ LLM provider not configured at startup: {e}")
+
+
+@app.on_event("shutdown")
+def _shutdown_executors():
+    shutdown_executors(wait=False)
+    close_driver_pool()
+    get_extractor_strategy().save()
+
+
+@app.get("/api/metrics")
+async def api_metrics():
+    """Runtime counters for sizing pools and caches"""
+    content_cache = get_content_cache()
+    summary_cache = get_summary_cache()
+    return {
+        'driver_pool': get_driver_pool().stats(),
+        'page_wait': wait_stats(),
+        'content_cache': content_cache.stats() if content_cache else None,
+        'single_flight': {'fetch': fetch_flight.stats(), 'summary': summary_flight.stats()},
+        'extractor_strategy': get_extractor_strategy().stats(),
+        'negative_cache': negative_cache.stats(),
+        'circuit_breakers': circuit_breakers.stats(),
+        'page_memory': page_memory.stats(),
+        'transcripts': transcript_cache_stats(),
+        'language_detection': language_cache_stats(),
+        'llm': get_llm_client().stats(),
+        'llm_scheduler': get_llm_scheduler().stats(),
+        'summary_cache': summary_cache.stats() if summary_cache else None,
+        'timestamp': datetime.now().isoformat()
+    }
+
 # NewsSummaryRequest model
 class NewsSummaryRequest(BaseModel):
     query: str
@@ -36,180 +94,6 @@ class NewsSummaryRequest(BaseModel):
     user_email: str
     conversation_id: str
 
-# Function to detect the language of a song based on its content, URL, and title
-
-hindi_keywords = [
-        # Common Hindi words
-        "hai", "mein", "tum", "dil", "pyar", "tere", "hindi", "गीत", "गाना", "raataan", "lambiyan", "shershaah",
-        "kiara", "sid", "b praak", "jasleen", "royal", "anvita", "anvit", "kaur", "arijit", "singh", "bollywood",
-        "love song", "romantic song", "zindagi", "yaar", "mohabbat", "sapna", "chalo", "aaja", "jaana", "sun", "sapne",
-        "saath", "khwab", "yaadon", "yaari", "ishq", "janam", "safar", "pal", "raat", "din", "chand", "suraj", "aasman",
-        "dhadkan", "bekhayali", "tujhe", "mujhko", "sanam", "mehboob", "dosti", "shayar", "shayari", "kuch", "bata", "batao",
-        "kya", "kaise", "kaun", "kabhi", "kab", "kyun", "kyunki", "ab", "tab", "phir", "fir", "phir bhi", "tumse", "tumhi",
-        "tumko", "main", "mera", "meri", "mere", "apna", "apni", "apne", "sapno", "sapne", "khush", "khushi", "khushiyan",
-        "dard", "gumsum", "yaad", "yaadein", "yaadon", "yaariyan", "suno", "sunlo", "sun raha", "sun raha hai na tu",
-        "aankh", "aankhon", "aansu", "muskurana", "muskurane", "muskurata", "muskurati", "muskurate", "muskurahat",
-        "chahat", "chahatein", "chahata", "chahati", "chahate", "chah", "chaha", "chahiye", "chahungi", "chahunga",
-        "chahte", "chahtey", "chahte ho", "chahte hoon", "chahte hain", "chahte hoon", "chahte ho", "chahte hain",
-        "chahte hoon", "chahte ho", "chahte hain", "chahte hoon", "chahte ho", "chahte hain", "chahte hoon", "chahte ho",
-        "chahte hain", "chahte hoon", "chahte ho", "chahte hain", "chahte hoon", "chahte ho", "chahte hain", "chahte hoon",
-        "chahte ho", "chahte hain", "chahte hoon", "chahte ho", "chahte hain", "chahte hoon", "chahte ho", "chahte hain",
-        # Popular Hindi singers
-        "arijit singh", "shreya ghoshal", "sonu nigam", "udit narayan", "alka yagnik", "kumar sanu", "kishore kumar",
-        "lata mangeshkar", "asha bhosle", "mohit chauhan", "jubin nautiyal", "neha kakkar", "badshah", "yo yo honey singh",
-        "atif aslam", "sunidhi chauhan", "palak muchhal", "kk", "rahat fateh ali khan", "shaan", "ankit tiwari",
-        # Bollywood movie names (partial)
-        "dilwale", "kabir singh", "shershaah", "yeh jawaani hai deewani", "kal ho naa ho", "dil chahta hai", "barfi",
-        "tamasha", "rockstar", "aashiqui", "aashiqui 2", "baazigar", "dangal", "lagaan", "chak de india", "kabhi khushi kabhie gham",
-        "kuch kuch hota hai", "hum aapke hain koun", "hum dil de chuke sanam", "devdas", "veer-zaara", "jab we met", "zindagi na milegi dobara"
-    ]
-french_keywords = [
-        # Common French words
-        "je", "le", "la", "français", "amour", "paris", "france", "toi", "moi", "nous", "vous", "ils", "elles", "être",
-        "avoir", "faire", "dire", "pouvoir", "aller", "voir", "vouloir", "venir", "devoir", "prendre", "trouver", "donner",
-        "parler", "aimer", "chanter", "chanson", "musique", "paroles", "coeur", "fleur", "soleil", "lune", "nuit", "jour",
-        "rêve", "rêver", "baiser", "douce", "doucement", "beau", "belle", "joli", "jolie", "fille", "garçon", "femme", "homme",
-        "mon", "ma", "mes", "ton", "ta", "tes", "son", "sa", "ses", "notre", "votre", "leur", "leurs", "chérie", "chéri",
-        "mon amour", "ma vie", "mon coeur", "ma belle", "mon chéri", "ma chérie", "mon ange", "ma princesse", "mon prince",
-        # French singers
-        "edith piaf", "johnny hallyday", "mylene farmer", "francis cabrel", "charles aznavour", "stromaé", "indila", "zaz",
-        "patrick bruel", "julien doré", "louane", "vianney", "christophe mae", "claude françois", "louis bertignac",
-        # French song/album names
-        "la vie en rose", "ne me quitte pas", "je t'aime", "je te promets", "formidable", "papaoutai", "dernière danse",
-        "sous le vent", "elle me dit", "si jamais j'oublie", "parler à mon père", "on écrit sur les murs"
-    ]
-german_keywords = [
-        # Common German words
-        "liebe", "deutsch", "berlin", "german", "schatz", "lied", "herz", "leben", "träume", "nacht", "tag", "himmel",
-        "sonne", "mond", "sterne", "freund", "freundin", "mädchen", "junge", "frau", "mann", "mein", "meine", "dein",
-        "deine", "unser", "unsere", "euer", "eure", "ihr", "ihre", "ich", "du", "er", "sie", "es", "wir", "ihr", "sie",
-        "dich", "mich", "uns", "euch", "ihn", "sie", "es", "uns", "euch", "sie", "ihnen", "musik", "liedtext", "singen",
-        "sänger", "sängerin", "band", "album", "titel", "melodie", "refrain", "vers", "chor", "tanz", "party", "spaß",
-        # German singers/bands
-        "helene fischer", "udo lindenberg", "herbert grönemeyer", "nena", "tokio hotel", "cro", "mark forster", "sido",
-        "peter fox", "xavier naidoo", "andreas bourani", "revolverheld", "silbermond", "pur", "die toten hosen", "die ärzte",
-        # German song/album names
-        "atemlos durch die nacht", "99 luftballons", "männer", "auf uns", "tage wie diese", "ein hoch auf uns", "ich will nur",
-        "ich will", "ich liebe dich", "du bist mein", "mein herz brennt", "ich geh in flammen auf"
-    ]
-japanese_keywords = [
-        # Common Japanese words/phrases
-        "watashi", "anata", "nihon", "japan", "koi", "suki", "日本", "歌", "愛", "恋", "心", "夢", "夜", "日", "月", "星",
-        "空", "花", "桜", "涙", "友達", "友", "君", "僕", "私", "あなた", "彼", "彼女", "好き", "大好き", "愛してる", "会いたい",
-        "ありがとう", "さようなら", "おはよう", "こんばんは", "おやすみ", "歌詞", "音楽", "メロディー", "バンド", "シンガー", "アルバム",
-        "タイトル", "リフレイン", "サビ", "ダンス", "パーティー", "楽しい", "悲しい", "嬉しい", "切ない", "寂しい", "幸せ", "希望",
-        # Japanese singers/bands
-        "宇多田ヒカル", "浜崎あゆみ", "米津玄師", "中島美嘉", "嵐", "乃木坂46", "欅坂46", "perfume", "one ok rock", "bump of chicken",
-        "king gnu", "official髭男dism", "あいみょん", "back number", "yui", "lisa", "yoasobi", "aimyon", "utada hikaru", "kenshi yonezu",
-        # Japanese song/album names
-        "first love", "lemon", "pretender", "紅蓮華", "炎", "打上花火", "小さな恋のうた", "さくら", "ありがとう", "世界に一つだけの花"
-    ]
-english_keywords = [
-        # Common English words/phrases
-        "the", "love", "baby", "girl", "boy", "english", "heart", "music", "song", "you", "me", "us", "life", "dream",
-        "night", "day", "moon", "sun", "star", "sky", "friend", "friends", "dance", "party", "happy", "sad", "cry", "smile",
-        "kiss", "hug", "forever", "always", "never", "together", "apart", "alone", "miss", "missing", "remember", "forget",
-        "goodbye", "hello", "hi", "hey", "yeah", "oh", "yeah yeah", "oh oh", "la la", "na na", "chorus", "verse", "melody",
-        "lyrics", "band", "album", "track", "playlist", "single", "hit", "top", "chart", "radio", "remix", "cover", "original",
-        # English singers/bands
-        "taylor swift", "ed sheeran", "justin bieber", "ariana grande", "beyonce", "rihanna", "drake", "adele", "bruno mars",
-        "billie eilish", "dua lipa", "the weeknd", "shawn mendes", "lady gaga", "katy perry", "maroon 5", "coldplay", "eminem",
-        "post malone", "selena gomez", "harry styles", "olivia rodrigo", "sam smith", "sia", "imagine dragons", "one direction",
-        # English song/album names
-        "shape of you", "blinding lights", "bad guy", "someone like you", "hello", "rolling in the deep", "love story", "perfect",
-        "thinking out loud", "all of me", "let her go", "see you again", "uptown funk", "closer", "faded", "cheap thrills"
-    ]
-
-    # Function to detect the language of a song based on its content, URL, and title
-def detect_song_language(content, url, title):
-    text_all = f"{content} {url} {title}".lower()
-
-    # 1. Script-based detection (highest priority)
-    if re.search(r'[\u0900-\u097F]', text_all):
-        return "hindi"
-    if re.search(r'[\u3040-\u30ff\u31f0-\u31ff\u3400-\u4dbf\u4e00-\u9fff]', text_all):
-        return "japanese"
-    # German-specific characters
-    if re.search(r'[äöüß]', text_all):
-        return "german"
-    # French-specific characters
-    if re.search(r'[àâçéèêëîïôœùûüÿ]', text_all):
-        return "french"
-
-    # 2. Keyword-based detection (non-English first)
-    if any(word in text_all for word in hindi_keywords):
-        return "hindi"
-    if any(word in text_all for word in french_keywords):
-        return "french"
-    if any(word in text_all for word in japanese_keywords):
-        return "japanese"
-    if any(word in text_all for word in german_keywords):
-        return "german"
-
-    # 3. Only now check for English keywords
-    if any(word in text_all for word in english_keywords):
-        return "english"
-
-    # 4. Fallback: langdetect
-    try:
-        text = f"{content} {title}".strip()
-        if text and len(text.split()) > 5:
-            lang = detect(text)
-            if lang == "hi":
-                return "hindi"
-            elif lang == "fr":
-                return "french"
-            elif lang == "ja":
-                return "japanese"
-            elif lang == "de":
-                return "german"
-            elif lang == "en":
-                return "english"
-    except LangDetectException:
-        pass
-
-    # 5. Fallback: URL/title hints
-    if "hindi" in url or "hindi" in title:
-        return "hindi"
-    if "french" in url or "francais" in title:
-        return "french"
-    if "japan" in url or "japanese" in title:
-        return "japanese"
-    if "german" in url or "deutsch" in title:
-        return "german"
-    if "english" in url or "english" in title:
-        return "english"
-
-    return "unknown"
-
-    # 6. If nothing matches, return unknown
-
-    # --- Expanded keyword lists for each language ---
-
-
-    text_all = f"{content} {url} {title}".lower()
-    if any(word in text_all for word in hindi_keywords) or re.search(r'[\u0900-\u097F]', text_all):
-        return "hindi"
-    if any(word in text_all for word in french_keywords):
-        return "french"
-    if any(word in text_all for word in japanese_keywords) or re.search(r'[\u3040-\u30ff\u31f0-\u31ff\u3400-\u4dbf\u4e00-\u9fff]', text_all):
-        return "japanese"
-    if any(word in text_all for word in german_keywords):
-        return "german"
-    if any(word in text_all for word in english_keywords):
-        return "english"
-    if "hindi" in url or "hindi" in title:
-        return "hindi"
-    if "french" in url or "francais" in title:
-        return "french"
-    if "japan" in url or "japanese" in title:
-        return "japanese"
-    if "german" in url or "deutsch" in title:
-        return "german"
-    if "english" in url or "english" in title:
-        return "english"
-    return "unknown"
-
 # --- Language support mapping for bots ---
 def is_language_supported_by_bot(bot_id: str, detected_language: str) -> bool:
     bot_id = bot_id.lower().strip()
@@ -225,16 +109,7 @@ def is_language_supported_by_bot(bot_id: str, detected_language: str) -> bool:
 
 # --- Language support mapping for bots ---
 def call_gemini_ai(prompt, max_tokens=180):
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    response = model.generate_content(
-        prompt,
-        generation_config=genai.types.GenerationConfig(
-            max_output_tokens=max_tokens,
-            temperature=0.7,
-        )
-    )
-    return response.text.strip()
+    return get_llm_scheduler().generate(prompt, max_tokens=max_tokens)
 
 #if the detected language is not supported by the bot, return a friendly message
 
@@ -251,8 +126,37 @@ def get_unsupported_language_message(detected_language):
 
 
 
-@app.post("/api/news")
-async def api_news(request: NewsSummaryRequest):
+def _song_prompt(bot_persona, title, content):
+    return (
+        f"{bot_persona}\n"
+        "You are a music-loving assistant. When summarizing a song, adapt your tone and emojis to the mood of the lyrics (love, heartbreak, party, motivational, sad, etc.) "
+        "and to your persona (mentor, friend, romantic, etc.). "
+        "For each response, the proactive message (Line 3) must be unique, creative, and use different emojis that fit both the mood and the persona. "
+        "Do NOT repeat the same proactive message or emoji style for every song or persona. "
+        "For example:\n"
+        "- For a friend persona and party song, use fun, energetic language and party emojis 🎉🕺.\n"
+        "- For a romantic persona and love song, use sweet, dreamy language and heart/love emojis 💖😍.\n"
+        "- For a mentor persona and motivational song, use encouraging words and uplifting emojis 🚀🌟.\n"
+        "- For a friend persona and heartbreak song, use supportive, caring words and comforting emojis 🤗💔.\n"
+        "Be creative and make each proactive message feel personal and fresh!\n"
+        f"Song title: {title}\n"
+        f"Lyrics/content: {content[:1500]}\n"
+        "Respond in three lines (no labels):\n"
+        "Do not ever mention the song name or movie name in your response."
+        "- First line: Song summary (first sentence)\n"
+        "- Second line: Song summary (second sentence, or leave blank if not needed)\n"
+        "- Third line: Proactive message or question for the user that fits the mood and your persona, with unique emojis.\n"
+        "If the summary can be done in one sentence, leave the second line blank.\n"
+    )
+
+
+async def _news_events(request: NewsSummaryRequest, stream_tokens=False):
+    """The /api/news pipeline as a sequence of (event, data) pairs.
+
+    Emits 'stage' events as the pipeline progresses, 'token' events with summary text when
+    `stream_tokens` is set, and always ends with one 'final' event whose data is the JSON
+    response of /api/news.
+    """
     try:
         query = request.query
         bot_id = request.bot_id
@@ -262,29 +166,31 @@ async def api_news(request: NewsSummaryRequest):
 
         detected_urls = detect_urls_in_query(query)
         if detected_urls:
+            yield 'stage', {'stage': 'url_detected', 'urls': detected_urls}
             # --- 2. Fetch website content for the first detected URL ---
-            website_data = fetch_website_content(detected_urls[0])
+            website_data = await fetch_website_content_async(detected_urls[0])
             if website_data:
                 url = website_data.get("url", "")
                 content = website_data.get("content", "")
                 title = website_data.get("title", "")
+                yield 'stage', {'stage': 'content_fetched', 'url': url, 'title': title,
+                                'type': website_data.get('type'), 'extraction': website_data.get('extraction')}
 
                 # --- 3. Check if the URL or title suggests a song/music link ---
-                song_keywords = [
-                    "spotify", "youtube", "youtu.be", "song", "lyrics", "music", "album", "track", "playlist", "गीत", "गाना"
-                ]
-                # If any keyword is present in the URL or title, treat as a song/music link
-                is_song = any(kw in url.lower() for kw in song_keywords) or any(kw in title.lower() for kw in song_keywords)
+                is_song = is_song_link(url, title)
                 # --- 4. Song detected: Get bot persona and detect song language ---
                 if is_song:
                     from bot_prompt import get_bot_prompt
                     bot_persona = get_bot_prompt(bot_id)
-                    song_language = detect_song_language(content, url, title)
+                    # Stored with cached website_data, so content cache hits skip detection
+                    song_language = website_song_language(website_data)
                     print(f"DEBUG: bot_id={bot_id}, detected_language={song_language}, supported={BOT_LANGUAGE_MAP.get(bot_id, BOT_LANGUAGE_MAP['default'])}")
+                    supported = is_language_supported_by_bot(bot_id, song_language)
+                    yield 'stage', {'stage': 'language_detected', 'language': song_language, 'supported': supported}
                     # Language-bot matching logic
-                    if not is_language_supported_by_bot(bot_id, song_language):
+                    if not supported:
                         print(f"DEBUG: Language '{song_language}' is NOT supported by bot '{bot_id}'. Returning unsupported message.")
-                        return {
+                        yield 'final', {
                             'status': 'error',
                             'result': get_unsupported_language_message(song_language),
                             'mode': 'website_summary',
@@ -295,36 +201,44 @@ async def api_news(request: NewsSummaryRequest):
                                 'supported_languages': BOT_LANGUAGE_MAP.get(bot_id, BOT_LANGUAGE_MAP['default'])
                             }
                         }
+                        return
                     print(f"DEBUG: Language '{song_language}' IS supported by bot '{bot_id}'. Proceeding to AI summary.")
                     # If supported, proceed as before
-                    persona_instructions = (
-                        f"{bot_persona}\n"
-                        "You are a music-loving assistant. When summarizing a song, adapt your tone and emojis to the mood of the lyrics (love, heartbreak, party, motivational, sad, etc.) "
-                        "and to your persona (mentor, friend, romantic, etc.). "
-                        "For each response, the proactive message (Line 3) must be unique, creative, and use different emojis that fit both the mood and the persona. "
-                        "Do NOT repeat the same proactive message or emoji style for every song or persona. "
-                        "For example:\n"
-                        "- For a friend persona and party song, use fun, energetic language and party emojis 🎉🕺.\n"
-                        "- For a romantic persona and love song, use sweet, dreamy language and heart/love emojis 💖😍.\n"
-                        "- For a mentor persona and motivational song, use encouraging words and uplifting emojis 🚀🌟.\n"
-                        "- For a friend persona and heartbreak song, use supportive, caring words and comforting emojis 🤗💔.\n"
-                        "Be creative and make each proactive message feel personal and fresh!\n"
-                        f"Song title: {title}\n"
-                        f"Lyrics/content: {content[:1500]}\n"
-                        "Respond in three lines (no labels):\n"
-                        "Do not ever mention the song name or movie name in your response."
-                        "- First line: Song summary (first sentence)\n"
-                        "- Second line: Song summary (second sentence, or leave blank if not needed)\n"
-                        "- Third line: Proactive message or question for the user that fits the mood and your persona, with unique emojis.\n"
-                        "If the summary can be done in one sentence, leave the second line blank.\n"
-                    )
+                    persona_instructions = _song_prompt(bot_persona, title, content)
                     # --- 7. Call Gemini AI to generate the summary using the instructions ---
-                    ai_response = call_gemini_ai(persona_instructions, max_tokens=180)
+                    summary_key = SummaryCache.key(bot_id, 'song', SONG_PROMPT_VERSION, SONG_SUMMARY_MAX_TOKENS,
+                                                   title, content[:1500])
+                    if stream_tokens:
+                        summary_events = stream_cached_generation(
+                            summary_key,
+                            lambda: get_llm_scheduler().stream_async(persona_instructions, max_tokens=SONG_SUMMARY_MAX_TOKENS)
+                        )
+                    else:
+                        ai_response = await summary_flight.do(
+                            (canonicalize_url(url), bot_id, 'song'),
+                            lambda: cached_generation(
+                                summary_key,
+                                lambda: get_llm_scheduler().generate_async(persona_instructions, max_tokens=SONG_SUMMARY_MAX_TOKENS)
+                            )
+                        )
                 else:
                     # --- 8. If not a song/music link, generate a regular website/news summary ---
-                    ai_response = create_website_summary_response(query, website_data, bot_id=bot_id)
+                    if stream_tokens:
+                        summary_events = stream_website_summary_async(query, website_data, bot_id=bot_id)
+                    else:
+                        ai_response = await summary_flight.do(
+                            (canonicalize_url(url), bot_id, 'website'),
+                            lambda: create_website_summary_response_async(query, website_data, bot_id=bot_id)
+                        )
+                if stream_tokens:
+                    # Streamed generations bypass summary_flight: followers could not replay the tokens
+                    async for event, text in summary_events:
+                        if event == 'token':
+                            yield 'token', {'text': text}
+                        else:
+                            ai_response = text
                 # --- 9. Return the AI response and website data ---
-                return {
+                yield 'final', {
                     'status': 'success',
                     'ai_response': ai_response,
                     'website_data': website_data,
@@ -334,24 +248,58 @@ async def api_news(request: NewsSummaryRequest):
                 }
             else:
                 # --- 10. Could not fetch website content ---
-                return {
+                yield 'final', {
                     'status': 'error',
                     'result': f"Could not fetch content from {detected_urls[0]}",
                     'mode': 'website_summary',
                     'timestamp': datetime.now().isoformat()
                 }
+            return
         # --- 11. No URL found in the query ---
-        return {
+        yield 'final', {
             'status': 'error',
             'result': "No website or YouTube link found in your query.",
             'mode': 'website_summary',
             'timestamp': datetime.now().isoformat()
         }
+    except LLMError as e:
+        # Rate limited / overloaded after retries, or refused by the scheduler: say so plainly
+        print(f"⚠️ LLM unavailable: {e}")
+        yield 'final', {
+            'status': 'error',
+            'result': "I'm getting a lot of requests right now, please try again in a moment.",
+            'reason': 'llm_busy' if e.status == 'overloaded' else 'llm_unavailable',
+            'retry_after': e.retry_after,
+            'mode': 'website_summary',
+            'timestamp': datetime.now().isoformat()
+        }
     except Exception as e:
         import traceback
-        return {
+        yield 'final', {
             'status': 'error',
             'result': f'Internal error: {str(e)}',
             'traceback': traceback.format_exc(),
             'timestamp': datetime.now().isoformat()
         }
+
+
+@app.post("/api/news")
+async def api_news(request: NewsSummaryRequest):
+    async for event, data in _news_events(request):
+        if event == 'final':
+            return data
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.post("/api/news/stream")
+async def api_news_stream(request: NewsSummaryRequest):
+    """/api/news over Server-Sent Events: stage events, summary tokens, then the usual JSON as 'final'"""
+    async def events():
+        async for event, data in _news_events(request, stream_tokens=True):
+            yield _sse(event, data)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
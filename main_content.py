@@ -0,0 +1,255 @@
+import os
+import codecs
+import itertools
+from html.parser import HTMLParser
+from bs4 import Tag, NavigableString, CData
+from bs4.dammit import EncodingDetector
+
+MAIN_CONTENT_BUDGET = int(os.getenv("MAIN_CONTENT_BUDGET", "3000"))                      # characters
+MAIN_CONTENT_MIN_BLOCK_CHARS = int(os.getenv("MAIN_CONTENT_MIN_BLOCK_CHARS", "30"))
+MAIN_CONTENT_MAX_LINK_DENSITY = float(os.getenv("MAIN_CONTENT_MAX_LINK_DENSITY", "0.5"))  # share of block text inside <a>
+
+# Subtrees that never hold article text
+SKIP_TAGS = frozenset(['script', 'style', 'nav', 'header', 'footer', 'aside', 'advertisement', 'noscript'])
+
+# Elements that start a new block of text; inline elements (span, a, b, ...) stay inside their block
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'blockquote', 'body', 'dd', 'details', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'html', 'li', 'main',
+    'ol', 'p', 'pre', 'section', 'summary', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul',
+])
+
+# Same strings get_text() returns: skips comments, doctypes and script/style/template strings
+_TEXT_TYPES = (NavigableString, CData)
+
+
+def _has_class(name):
+    return lambda el: name in (el.get('class') or ())
+
+
+def _has_id(name):
+    return lambda el: el.get('id') == name
+
+
+# Common main-content containers in priority order
+CONTENT_CONTAINERS = [
+    lambda el: el.name == 'article',
+    lambda el: el.name == 'main',
+    lambda el: el.get('role') == 'main',
+    _has_class('content'), _has_class('main-content'), _has_class('post-content'),
+    _has_class('entry-content'), _has_class('article-content'), _has_class('story-body'),
+    _has_id('content'), _has_id('main-content'), _has_class('container'), _has_id('mw-content-text'),
+]
+
+
+def _iter_tags(root):
+    """Tags under `root` in document order, without descending into SKIP_TAGS"""
+    stack = list(reversed(root.contents))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Tag) and node.name not in SKIP_TAGS:
+            yield node
+            stack.extend(reversed(node.contents))
+
+
+def find_main_container(root):
+    """Return the first element matching the highest-priority content container, or None"""
+    best_index, best = len(CONTENT_CONTAINERS), None
+    for element in _iter_tags(root):
+        for index in range(best_index):
+            if CONTENT_CONTAINERS[index](element):
+                best_index, best = index, element
+                break
+        if best_index == 0:
+            break
+    return best
+
+
+class _BlockCollector:
+    """Accumulates the current text run and keeps it if it looks like content"""
+
+    def __init__(self, budget, min_chars, max_link_density):
+        self.budget = budget
+        self.min_chars = min_chars
+        self.max_link_density = max_link_density
+        self.blocks = []
+        self.total = 0
+        self._parts = []
+        self._chars = 0
+        self._link_chars = 0
+
+    @property
+    def full(self):
+        return self.total >= self.budget
+
+    def add(self, text, in_link):
+        text = text.strip()
+        if not text:
+            return
+        if self._chars < self.budget:  # lengths keep counting, stored text does not grow past the budget
+            self._parts.append(text)
+        self._chars += len(text)
+        if in_link:
+            self._link_chars += len(text)
+
+    def flush(self):
+        if self._parts and self._chars > self.min_chars \
+                and self._link_chars / self._chars <= self.max_link_density:
+            block = ' '.join(self._parts)
+            self.blocks.append(block)
+            self.total += len(block) + 2
+        self._parts = []
+        self._chars = 0
+        self._link_chars = 0
+
+
+def extract_main_text(root, budget=MAIN_CONTENT_BUDGET, min_chars=MAIN_CONTENT_MIN_BLOCK_CHARS,
+                      max_link_density=MAIN_CONTENT_MAX_LINK_DENSITY):
+    """Readable text under `root` as blocks separated by blank lines.
+
+    Every node is visited once: text is attributed to the run between block boundaries it
+    sits in, so nested containers never serialize the same text twice. Runs that are too
+    short or mostly link text (menus, tag clouds, related-article lists) are dropped, and the
+    walk stops as soon as `budget` characters have been collected.
+    """
+    collector = _BlockCollector(budget, min_chars, max_link_density)
+    stack = [(root, False)]
+    link_depth = 0
+    while stack and not collector.full:
+        node, leaving = stack.pop()
+        if leaving:
+            if node.name == 'a':
+                link_depth -= 1
+            else:
+                collector.flush()
+            continue
+        if isinstance(node, Tag):
+            if node.name in SKIP_TAGS:
+                continue
+            if node.name in BLOCK_TAGS:
+                collector.flush()
+                stack.append((node, True))
+            elif node.name == 'a':
+                link_depth += 1
+                stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.contents))
+        elif type(node) in _TEXT_TYPES:
+            collector.add(node, link_depth > 0)
+    collector.flush()
+    return '\n\n'.join(collector.blocks)
+
+
+class StreamingMainText(HTMLParser):
+    """Incremental variant of extract_main_text for raw HTML arriving in chunks.
+
+    Applies the same block, link-density and budget rules to parser events, so the caller
+    can stop downloading as soon as `full` becomes true. There is no container lookup here:
+    the page is scored as a whole.
+    """
+
+    def __init__(self, budget=MAIN_CONTENT_BUDGET, min_chars=MAIN_CONTENT_MIN_BLOCK_CHARS,
+                 max_link_density=MAIN_CONTENT_MAX_LINK_DENSITY):
+        super().__init__(convert_charrefs=True)
+        self.collector = _BlockCollector(budget, min_chars, max_link_density)
+        self.title = ''
+        self._skip_depth = 0
+        self._link_depth = 0
+        self._in_title = False
+        self._pending = []  # text between two tags can arrive split over several feeds
+
+    @property
+    def full(self):
+        return self.collector.full
+
+    def _emit_pending(self):
+        if self._pending:
+            text = ''.join(self._pending)
+            self._pending = []
+            if self._in_title:
+                self.title = self.title or text.strip()
+            elif not self._skip_depth:
+                self.collector.add(text, self._link_depth > 0)
+
+    def handle_starttag(self, tag, attrs):
+        self._emit_pending()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == 'title':
+            self._in_title = True
+        elif tag == 'a':
+            self._link_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.collector.flush()
+
+    def handle_startendtag(self, tag, attrs):
+        self._emit_pending()
+        if tag in BLOCK_TAGS:
+            self.collector.flush()
+
+    def handle_endtag(self, tag):
+        self._emit_pending()
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == 'title':
+            self._in_title = False
+        elif tag == 'a':
+            self._link_depth = max(0, self._link_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.collector.flush()
+
+    def handle_data(self, data):
+        if self._in_title or not self._skip_depth:
+            self._pending.append(data)
+
+    def text(self):
+        self._emit_pending()
+        self.collector.flush()
+        return '\n\n'.join(self.collector.blocks)
+
+
+def _known_codec(name):
+    try:
+        return codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return None
+
+
+def sniff_encoding(head):
+    """Encoding of an HTML body whose response had no charset, from its first bytes.
+
+    A byte order mark or <meta charset> / http-equiv declaration wins; otherwise UTF-8 if
+    the bytes decode as UTF-8, else Windows-1252 (what browsers assume for legacy pages).
+    """
+    _, bom_encoding = EncodingDetector.strip_byte_order_mark(head)
+    declared = bom_encoding or EncodingDetector.find_declared_encoding(head, is_html=True)
+    if declared and _known_codec(declared):
+        return _known_codec(declared)
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the end of the chunk is still UTF-8
+        return 'utf-8' if e.start >= len(head) - 3 else 'windows-1252'
+
+
+def extract_main_text_streaming(chunks, encoding=None, **kwargs):
+    """Feed raw HTML chunks into StreamingMainText until its budget is filled.
+
+    Without an `encoding` (no HTTP charset) it is sniffed from the first chunk. Returns
+    (title, text, bytes_consumed); the remaining chunks are never pulled, so the caller's
+    download stops there as well.
+    """
+    parser = StreamingMainText(**kwargs)
+    chunks = iter(chunks)
+    first = next(chunks, b'')
+    decoder = codecs.getincrementaldecoder(encoding or sniff_encoding(first))(errors='replace')
+    consumed = 0
+    for chunk in itertools.chain([first], chunks):
+        consumed += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.full:
+            break
+    else:
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+    return parser.title, parser.text(), consumed
@@ -0,0 +1,138 @@
+import os
+from datetime import datetime
+from urllib.parse import urlparse
+from http_client import fetch, fetch_json
+from html_parsing import make_soup, PARTIAL_TAGS
+from page_budget import page_memory
+from bs4 import SoupStrainer
+
+METADATA_TIMEOUT = float(os.getenv("METADATA_TIMEOUT", "4"))
+METADATA_HEAD_MAX_BYTES = int(os.getenv("METADATA_HEAD_MAX_BYTES", str(512 * 1024)))
+
+# oEmbed endpoints per provider; overridable so the tier can run against a local stub server
+OEMBED_ENDPOINTS = {
+    'youtube': os.getenv("YOUTUBE_OEMBED_URL", "https://www.youtube.com/oembed"),
+    'spotify': os.getenv("SPOTIFY_OEMBED_URL", "https://open.spotify.com/oembed"),
+}
+
+# Hosts whose pages are songs/videos rather than articles
+SONG_HOSTS = (
+    'youtube.com', 'youtu.be', 'spotify.com', 'music.apple.com', 'soundcloud.com',
+    'gaana.com', 'jiosaavn.com', 'wynk.in', 'deezer.com',
+)
+
+
+def is_song_host(url):
+    host = urlparse(url).netloc.lower()
+    return any(host == h or host.endswith('.' + h) for h in SONG_HOSTS)
+
+
+def _oembed_provider(url):
+    host = urlparse(url).netloc.lower()
+    if host.endswith('youtube.com') or host == 'youtu.be':
+        return 'youtube'
+    if host.endswith('spotify.com'):
+        return 'spotify'
+    return None
+
+
+def fetch_oembed(url):
+    """Query the provider's oEmbed endpoint; returns its JSON dict or None"""
+    provider = _oembed_provider(url)
+    if not provider:
+        return None
+    try:
+        with page_memory.lease(url) as lease:
+            return fetch_json(OEMBED_ENDPOINTS[provider], params={'url': url, 'format': 'json'},
+                              timeout=METADATA_TIMEOUT, memory=lease)
+    except Exception as e:
+        print(f"⚠️ oEmbed lookup failed for {url}: {e}")
+        return None
+
+
+def fetch_head_meta(url):
+    """Download only the document <head> and return its og:/music:/twitter: and description meta tags"""
+    try:
+        with page_memory.lease(url) as lease:
+            response = fetch(url, timeout=METADATA_TIMEOUT, max_bytes=METADATA_HEAD_MAX_BYTES, stop_at=b'</head>',
+                             memory=lease)
+            soup = make_soup(response.content, 'metadata', encoding=response.encoding,
+                             parse_only=SoupStrainer(PARTIAL_TAGS))
+    except Exception as e:
+        print(f"⚠️ Head download failed for {url}: {e}")
+        return {}
+    return head_meta(soup)
+
+
+def head_meta(soup):
+    """og:/music:/twitter: and description meta tags of a parsed document (full or head-only soup)"""
+    meta = {}
+    for tag in soup.find_all('meta'):
+        key = tag.get('property') or tag.get('name')
+        value = (tag.get('content') or '').strip()
+        if not key or not value:
+            continue
+        key = key.lower()
+        if key.startswith(('og:', 'music:', 'twitter:')) or key in ('description', 'keywords'):
+            # Repeated tags (e.g. several music:musician) are kept as a list
+            if key in meta:
+                existing = meta[key]
+                meta[key] = existing + [value] if isinstance(existing, list) else [existing, value]
+            else:
+                meta[key] = value
+    if 'og:title' not in meta and soup.title and soup.title.string:
+        meta['title'] = soup.title.string.strip()
+    return meta
+
+
+def _first(value):
+    return value[0] if isinstance(value, list) else (value or '')
+
+
+def extract_song_metadata(url):
+    """Metadata-first extraction for song/video links: oEmbed + head-only meta tags, no browser.
+
+    Returns a website_data dict (type 'song_metadata') with enough title/artist/description
+    text for language detection and the song prompt, or None when nothing useful was found.
+    """
+    print(f"🎵 Trying metadata-first extraction for: {url}")
+    oembed = fetch_oembed(url) or {}
+    meta = fetch_head_meta(url)
+
+    title = _first(meta.get('og:title')) or oembed.get('title', '') or _first(meta.get('twitter:title')) \
+        or meta.get('title', '')
+    title = title.replace(' - YouTube', '').strip()
+    artist = _first(meta.get('music:musician_description')) or oembed.get('author_name', '')
+    description = _first(meta.get('og:description')) or _first(meta.get('description')) \
+        or _first(meta.get('twitter:description'))
+    album = _first(meta.get('music:album'))
+    release_date = _first(meta.get('music:release_date'))
+    keywords = _first(meta.get('keywords'))
+
+    if not title:
+        print("⚠️ Metadata tier found no title")
+        return None
+
+    content_parts = [f"Title: {title}"]
+    if artist:
+        content_parts.append(f"Artist: {artist}")
+    if album and not album.startswith('http'):
+        content_parts.append(f"Album: {album}")
+    if release_date:
+        content_parts.append(f"Released: {release_date}")
+    if keywords:
+        content_parts.append(f"Topics/Tags: {keywords}")
+    if description:
+        content_parts.append(f"Description: {description[:800]}")
+
+    print(f"✅ Metadata extracted: {title[:50]}")
+    return {
+        'title': title,
+        'content': '. '.join(content_parts),
+        'url': url,
+        'type': 'song_metadata',
+        'artist': artist,
+        'description': description[:800],
+        'provider': oembed.get('provider_name', '') or _first(meta.get('og:site_name')),
+        'extracted_at': datetime.now().isoformat()
+    }
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", str(4 * 1024 * 1024)))            # hard cap for one page
+PAGE_MEMORY_BUDGET = int(os.getenv("PAGE_MEMORY_BUDGET", str(128 * 1024 * 1024)))  # all in-flight pages together
+PAGE_MEMORY_WAIT = float(os.getenv("PAGE_MEMORY_WAIT", "2"))                       # seconds to wait for headroom
+
+
+class MemoryBudgetExceeded(Exception):
+    """Raised when page bytes cannot be reserved within the wait time"""
+
+
+class PageLease:
+    """Page bytes held by one extraction attempt; released in full when the lease closes.
+
+    The lease may be closed by the coroutine that owns it while a worker thread (e.g. a
+    cancelled browser render) is still charging it; charges that land after close are
+    given back right away so they can't leak from the budget.
+    """
+
+    def __init__(self, budget, url, cap):
+        self.budget = budget
+        self.url = url
+        self.cap = cap
+        self.used = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        return max(0, self.cap - self.used)
+
+    def charge(self, nbytes):
+        """Account for `nbytes` more page data held by this request (no-op once closed)"""
+        if self.closed:
+            return
+        if self.used + nbytes > self.cap:
+            raise MemoryBudgetExceeded(f"{self.url} exceeds the per-page cap of {self.cap} bytes")
+        self.budget.reserve(nbytes)  # may wait for headroom, so not under the lease lock
+        with self._lock:
+            closed = self.closed
+            if not closed:
+                self.used += nbytes
+                used = self.used
+        if closed:
+            self.budget.release(nbytes)
+        else:
+            self.budget.observe_request(used)
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            used, self.used = self.used, 0
+        if used:
+            self.budget.release(used)
+        self.budget.lease_closed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class PageMemoryBudget:
+    """Process-wide budget of page bytes held by in-flight downloads and renders.
+
+    Each extraction attempt takes a lease and charges bytes as they arrive. A single page
+    can never exceed its cap, and when many large pages are in flight at once new data
+    waits briefly for headroom and is then refused instead of pushing the worker into OOM.
+    """
+
+    def __init__(self, limit=PAGE_MEMORY_BUDGET, wait=PAGE_MEMORY_WAIT):
+        self.limit = limit
+        self.wait = wait
+        self.in_use = 0
+        self.peak = 0
+        self.active_leases = 0
+        self.rejected = 0
+        self.largest_request = 0
+        self._cond = threading.Condition()
+
+    def lease(self, url, cap=PAGE_MAX_BYTES):
+        with self._cond:
+            self.active_leases += 1
+        return PageLease(self, url, cap)
+
+    def lease_closed(self):
+        with self._cond:
+            self.active_leases -= 1
+
+    def reserve(self, nbytes):
+        deadline = time.monotonic() + self.wait
+        with self._cond:
+            while self.in_use + nbytes > self.limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise MemoryBudgetExceeded(f"page memory budget of {self.limit} bytes is exhausted")
+                self._cond.wait(remaining)
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self, nbytes):
+        with self._cond:
+            self.in_use -= nbytes
+            self._cond.notify_all()
+
+    def observe_request(self, used):
+        with self._cond:
+            self.largest_request = max(self.largest_request, used)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit_bytes': self.limit,
+                'in_use_bytes': self.in_use,
+                'peak_bytes': self.peak,
+                'active_leases': self.active_leases,
+                'largest_request_bytes': self.largest_request,
+                'rejected': self.rejected,
+            }
+
+
+page_memory = PageMemoryBudget()
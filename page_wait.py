@@ -0,0 +1,122 @@
+import os
+import time
+import threading
+
+# Hard cap on how long any single page may be waited on, whatever the profile says
+PAGE_WAIT_DEADLINE = float(os.getenv("PAGE_WAIT_DEADLINE", "8"))
+PAGE_WAIT_POLL_INTERVAL = float(os.getenv("PAGE_WAIT_POLL_INTERVAL", "0.15"))
+
+# JS snippets evaluated on every poll
+_DOCUMENT_COMPLETE_JS = "return document.readyState === 'complete';"
+_YOUTUBE_READY_JS = (
+    "return !!(window.ytInitialData || window.ytInitialPlayerResponse || "
+    "document.querySelector('meta[property=\"og:title\"]'));"
+)
+_OG_TITLE_READY_JS = "return !!document.querySelector('meta[property=\"og:title\"]');"
+_MAIN_TEXT_LENGTH_JS = (
+    "var el = document.querySelector('article, main, [role=\"main\"]') || document.body;"
+    "return el ? el.innerText.length : 0;"
+)
+
+# Per-site wait profiles.
+#   ready_js     - page is usable as soon as this returns true
+#   stable_js    - page is usable once this value stops changing for `stable_for` seconds
+#   min_text     - stable_js value must reach at least this before it counts as stable
+#   max_wait     - profile-specific cap (still bounded by PAGE_WAIT_DEADLINE)
+WAIT_PROFILES = {
+    'youtube': {'ready_js': _YOUTUBE_READY_JS, 'max_wait': 6.0},
+    'spotify': {'ready_js': _OG_TITLE_READY_JS, 'max_wait': 4.0},
+    'news': {'stable_js': _MAIN_TEXT_LENGTH_JS, 'stable_for': 0.5, 'min_text': 200, 'max_wait': 5.0},
+    'default': {'ready_js': _DOCUMENT_COMPLETE_JS, 'stable_js': _MAIN_TEXT_LENGTH_JS, 'stable_for': 0.3,
+                'min_text': 1, 'max_wait': 4.0},
+}
+
+_stats_lock = threading.Lock()
+_wait_stats = {}
+
+
+def select_wait_profile(url):
+    """Pick the wait profile name for a URL"""
+    url_lower = url.lower()
+    if 'youtube.com/' in url_lower or 'youtu.be/' in url_lower:
+        return 'youtube'
+    if 'spotify.com/' in url_lower:
+        return 'spotify'
+    if any(hint in url_lower for hint in ('news', 'article', '/story', '/20')):
+        return 'news'
+    return 'default'
+
+
+def _evaluate(driver, script):
+    try:
+        return driver.execute_script(script)
+    except Exception:
+        return None
+
+
+def wait_for_page(driver, url, deadline=None, cancel_event=None):
+    """Poll the loaded page until its profile's readiness condition holds or the deadline passes.
+
+    Returns a report dict with the profile used, the seconds actually waited and whether
+    the page became ready before the deadline.
+    """
+    profile_name = select_wait_profile(url)
+    profile = WAIT_PROFILES[profile_name]
+    limit = min(profile.get('max_wait', PAGE_WAIT_DEADLINE), PAGE_WAIT_DEADLINE if deadline is None else deadline)
+
+    started = time.monotonic()
+    ready = False
+    last_value = None
+    stable_since = None
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+
+        ready_js = profile.get('ready_js')
+        stable_js = profile.get('stable_js')
+        ready_ok = bool(_evaluate(driver, ready_js)) if ready_js else True
+
+        if ready_ok and ready_js and not stable_js:
+            ready = True
+            break
+
+        if ready_ok and stable_js:
+            value = _evaluate(driver, stable_js)
+            now = time.monotonic()
+            if value is not None and value == last_value and value >= profile.get('min_text', 1):
+                if now - stable_since >= profile.get('stable_for', 0.3):
+                    ready = True
+                    break
+            else:
+                last_value = value
+                stable_since = now
+
+        if time.monotonic() - started >= limit:
+            break
+        time.sleep(PAGE_WAIT_POLL_INTERVAL)
+
+    waited = time.monotonic() - started
+    _record(profile_name, waited, ready)
+    print(f"⏱️ Page wait ({profile_name}): {waited:.2f}s, ready={ready}")
+    return {'profile': profile_name, 'waited_seconds': round(waited, 3), 'ready': ready}
+
+
+def _record(profile_name, waited, ready):
+    with _stats_lock:
+        stats = _wait_stats.setdefault(profile_name, {
+            'count': 0, 'timeouts': 0, 'total_seconds': 0.0, 'max_seconds': 0.0
+        })
+        stats['count'] += 1
+        stats['total_seconds'] += waited
+        stats['max_seconds'] = max(stats['max_seconds'], waited)
+        if not ready:
+            stats['timeouts'] += 1
+
+
+def wait_stats():
+    """Per-profile totals of time spent waiting on pages"""
+    with _stats_lock:
+        result = {}
+        for name, stats in _wait_stats.items():
+            result[name] = dict(stats, avg_seconds=stats['total_seconds'] / stats['count'] if stats['count'] else 0.0)
+        return result
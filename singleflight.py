@@ -0,0 +1,39 @@
+import asyncio
+import copy
+
+
+class SingleFlight:
+    """Collapse concurrent async calls that share a key into one execution.
+
+    The first caller for a key (the leader) starts the work as a task; callers that
+    arrive while it is still running await the same task instead of repeating it.
+    The task is shielded, so a disconnecting leader doesn't cancel it for the others.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._inflight = {}
+        self.leaders = 0
+        self.collapsed = 0
+
+    async def do(self, key, factory):
+        """Run `factory()` (a zero-arg coroutine function) once per key among concurrent callers"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+            result = await asyncio.shield(task)
+            # Followers get their own copy so nobody mutates the leader's result
+            return copy.copy(result) if isinstance(result, dict) else result
+
+        self.leaders += 1
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            'leaders': self.leaders,
+            'collapsed': self.collapsed,
+            'in_flight': len(self._inflight),
+        }
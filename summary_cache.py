@@ -0,0 +1,155 @@
+import os
+import json
+import random
+import hashlib
+import threading
+from content_cache import MemoryLRUTier, SQLiteTier
+
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "1") != "0"
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", "21600"))
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+SUMMARY_CACHE_DB = os.getenv("SUMMARY_CACHE_DB", "")  # optional SQLite file for the on-disk tier
+# Freshness jitter: keep up to K generations per key and answer hits with one of them.
+# The first K requests for a key still go to the LLM; 1 disables jitter.
+SUMMARY_CACHE_VARIANTS = max(1, int(os.getenv("SUMMARY_CACHE_VARIANTS", "1")))
+
+
+def content_fingerprint(*parts):
+    """Fast 128-bit hash of the content that goes into a prompt"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part or '').encode('utf-8', 'surrogatepass'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """Generated summaries keyed by (bot_id, mode, prompt version, max_tokens, content fingerprint).
+
+    Entries are {'generations': [...]} holding the last `variants` generations for a key,
+    checked tier by tier like the content cache.
+    """
+
+    def __init__(self, tiers, ttl=SUMMARY_CACHE_TTL, variants=SUMMARY_CACHE_VARIANTS):
+        self.tiers = tiers
+        self.ttl = ttl
+        self.variants = variants
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'sets': 0, 'filling': 0}
+        self._tier_hits = {tier.name: 0 for tier in tiers}
+
+    @staticmethod
+    def key(bot_id, mode, prompt_version, max_tokens, *content_parts):
+        return f"{bot_id}|{mode}|{prompt_version}|{max_tokens}|{content_fingerprint(*content_parts)}"
+
+    def _lookup(self, key):
+        for index, tier in enumerate(self.tiers):
+            entry = tier.get(key)
+            if entry is None:
+                continue
+            # Promote lower-tier hits so the next lookup is served from memory
+            for upper in self.tiers[:index]:
+                upper.set(key, entry, self.ttl)
+            return entry, tier.name
+        return None, None
+
+    def get(self, key):
+        """A cached generation for `key`, or None when the LLM should be called"""
+        entry, tier_name = self._lookup(key)
+        generations = (entry or {}).get('generations') or []
+        with self._lock:
+            if not generations:
+                self._counters['misses'] += 1
+                return None
+            if len(generations) < self.variants:
+                # Still collecting variants for freshness jitter
+                self._counters['filling'] += 1
+                return None
+            self._counters['hits'] += 1
+            self._tier_hits[tier_name] += 1
+        return random.choice(generations)
+
+    def add(self, key, text):
+        """Remember a new generation, keeping the last `variants` of them"""
+        if not text:
+            return
+        entry, _ = self._lookup(key)
+        generations = ((entry or {}).get('generations') or [])[-(self.variants - 1):] if self.variants > 1 else []
+        entry = {'generations': generations + [text]}
+        size = len(json.dumps(entry).encode('utf-8')) + len(key)
+        for tier in self.tiers:
+            tier.set(key, entry, self.ttl, size=size)
+        with self._lock:
+            self._counters['sets'] += 1
+
+    async def get_or_generate(self, key, factory):
+        """Cached generation for `key`, else await `factory()` (zero-arg coroutine function) and store it"""
+        cached = self.get(key)
+        if cached is not None:
+            bot_id, mode = key.split('|')[:2]
+            print(f"⚡ Summary cache hit for {bot_id} ({mode})")
+            return cached
+        text = await factory()
+        self.add(key, text)
+        return text
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters, tier_hits=dict(self._tier_hits))
+        lookups = stats['hits'] + stats['misses'] + stats['filling']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['variants'] = self.variants
+        stats['ttl'] = self.ttl
+        stats['tiers'] = {tier.name: tier.stats() for tier in self.tiers}
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_summary_cache():
+    """Return the process-wide summary cache, or None when caching is disabled"""
+    global _cache
+    if not SUMMARY_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            tiers = [MemoryLRUTier(SUMMARY_CACHE_MAX_BYTES)]
+            if SUMMARY_CACHE_DB:
+                tiers.append(SQLiteTier(SUMMARY_CACHE_DB))
+            _cache = SummaryCache(tiers)
+        return _cache
+
+
+async def cached_generation(key, factory):
+    """get_or_generate on the shared cache; calls `factory()` directly when caching is disabled"""
+    cache = get_summary_cache()
+    if cache is None:
+        return await factory()
+    return await cache.get_or_generate(key, factory)
+
+
+async def stream_cached_generation(key, stream_factory, finish=None):
+    """Streaming counterpart of cached_generation.
+
+    Yields ('token', text) chunks followed by one ('final', text) with the (finished) summary.
+    A cache hit comes out as a single token; on a miss the chunks of `stream_factory()` (an
+    async iterator of text) are passed through and the finished text is stored afterwards.
+    """
+    cache = get_summary_cache()
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        yield 'token', cached
+        yield 'final', cached
+        return
+    parts = []
+    async for text in stream_factory():
+        parts.append(text)
+        yield 'token', text
+    text = ''.join(parts).strip()
+    if finish is not None:
+        text = finish(text)
+    if cache:
+        cache.add(key, text)
+    yield 'final', text
@@ -0,0 +1,116 @@
+import os
+import re
+import html
+from xml.etree.ElementTree import XMLPullParser, ParseError
+from http_client import stream
+from content_cache import MemoryLRUTier
+
+TRANSCRIPT_ENABLED = os.getenv("TRANSCRIPT_ENABLED", "1") != "0"
+TRANSCRIPT_MAX_CHARS = int(os.getenv("TRANSCRIPT_MAX_CHARS", "1000"))
+TRANSCRIPT_TIMEOUT = float(os.getenv("TRANSCRIPT_TIMEOUT", "4"))
+TRANSCRIPT_MAX_BYTES = int(os.getenv("TRANSCRIPT_MAX_BYTES", str(2 * 1024 * 1024)))
+TRANSCRIPT_LANGUAGES = [lang.strip() for lang in os.getenv("TRANSCRIPT_LANGUAGES", "en,hi").split(',') if lang.strip()]
+TRANSCRIPT_CACHE_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", "86400"))
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+# Directory of <video_id>.xml timed-text files used instead of the network (offline runs)
+TRANSCRIPT_FIXTURE_DIR = os.getenv("TRANSCRIPT_FIXTURE_DIR", "")
+
+# Cue elements of the legacy (<transcript><text>) and srv3 (<timedtext><body><p>) formats
+_CUE_TAGS = ('text', 'p')
+_ANNOTATION = re.compile(r'^\[[^\]]*\]$')  # [Music], [Applause], ...
+_WHITESPACE = re.compile(r'\s+')
+
+_transcript_cache = MemoryLRUTier(TRANSCRIPT_CACHE_MAX_BYTES)
+
+
+def caption_tracks(player_response):
+    """Caption tracks listed in a ytInitialPlayerResponse (each has baseUrl, languageCode, kind)"""
+    renderer = ((player_response or {}).get('captions') or {}).get('playerCaptionsTracklistRenderer') or {}
+    return [track for track in renderer.get('captionTracks') or [] if track.get('baseUrl')]
+
+
+def select_caption_track(tracks, languages=TRANSCRIPT_LANGUAGES):
+    """Pick the best track: preferred languages first, uploaded captions before auto-generated ones"""
+    def rank(track):
+        code = (track.get('languageCode') or '').split('-')[0]
+        language_rank = languages.index(code) if code in languages else len(languages)
+        return language_rank, track.get('kind') == 'asr'
+
+    return min(tracks, key=rank) if tracks else None
+
+
+def parse_timedtext(chunks, max_chars=TRANSCRIPT_MAX_CHARS):
+    """Stream-parse a timed-text XML document given as an iterable of byte chunks.
+
+    Cues are collected in order until `max_chars` is reached; the remaining chunks are
+    not read, so a caller streaming from the network stops the download there too.
+    """
+    parser = XMLPullParser(events=('end',))
+    pieces = []
+    total = 0
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if element.tag not in _CUE_TAGS:
+                    continue
+                # Legacy tracks escape their text twice (&amp;#39;), so unescape once more
+                cue = _WHITESPACE.sub(' ', html.unescape(''.join(element.itertext()))).strip()
+                element.clear()
+                if not cue or _ANNOTATION.match(cue):
+                    continue
+                pieces.append(cue)
+                total += len(cue) + 1
+                if total >= max_chars:
+                    return ' '.join(pieces)[:max_chars]
+    except ParseError as e:
+        print(f"⚠️ Malformed timed-text document: {e}")
+    return ' '.join(pieces)[:max_chars]
+
+
+def _file_chunks(path, chunk_size=64 * 1024):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            yield chunk
+
+
+def fetch_timedtext(track, video_id='', max_chars=TRANSCRIPT_MAX_CHARS):
+    """Download and parse one caption track (or its fixture file when TRANSCRIPT_FIXTURE_DIR is set)"""
+    if TRANSCRIPT_FIXTURE_DIR:
+        path = os.path.join(TRANSCRIPT_FIXTURE_DIR, f"{video_id}.xml")
+        return parse_timedtext(_file_chunks(path), max_chars) if os.path.exists(path) else ''
+    with stream(track['baseUrl'], timeout=TRANSCRIPT_TIMEOUT, max_bytes=TRANSCRIPT_MAX_BYTES) as (_, chunks):
+        return parse_timedtext(chunks, max_chars)
+
+
+def get_transcript(player_response, video_id=None):
+    """Transcript sample for a video from its caption tracks, cached by video_id.
+
+    Returns '' when transcripts are disabled, the video has no captions or the download fails.
+    """
+    if not TRANSCRIPT_ENABLED or not player_response:
+        return ''
+    video_id = video_id or (player_response.get('videoDetails') or {}).get('videoId', '')
+    if video_id:
+        cached = _transcript_cache.get(video_id)
+        if cached is not None:
+            return cached
+
+    track = select_caption_track(caption_tracks(player_response))
+    if track is None:
+        transcript = ''
+    else:
+        try:
+            transcript = fetch_timedtext(track, video_id)
+            print(f"📝 Transcript: {len(transcript)} characters ({track.get('languageCode', '?')})")
+        except Exception as e:
+            print(f"⚠️ Transcript download failed for {video_id}: {e}")
+            return ''
+
+    if video_id:
+        _transcript_cache.set(video_id, transcript, TRANSCRIPT_CACHE_TTL, size=len(transcript.encode('utf-8')) + 64)
+    return transcript
+
+
+def transcript_cache_stats():
+    return _transcript_cache.stats()
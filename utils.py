@@ -2,38 +2,51 @@
 import re
 import os
 import time
-import json
+import asyncio
+import threading
 from datetime import datetime
 from urllib.parse import urlparse
 from newspaper import Article
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from bot_prompt import get_bot_prompt
+from executors import run_blocking
+from driver_pool import get_driver_pool
+from page_wait import wait_for_page
+from content_cache import get_content_cache, canonicalize_url
+from singleflight import SingleFlight
+from youtube import (
+    is_youtube_url, extract_video_id, fetch_youtube_fast, build_youtube_video_data,
+    extract_player_response, youtube_fields_from_player_response, collect_youtube_fields
+)
+from transcripts import get_transcript
+from metadata import extract_song_metadata, is_song_host
+from http_client import fetch, stream, response_encoding, FetchCancelled
+from page_budget import page_memory, PAGE_MAX_BYTES
+from extractor_strategy import get_extractor_strategy, domain_of
+from circuit_breaker import negative_cache, circuit_breakers
+from main_content import find_main_container, extract_main_text, extract_main_text_streaming
+from html_parsing import make_soup, make_partial_soup, PARTIAL_PARSE
+from language_detection import annotate_song_language
+from llm_scheduler import get_llm_scheduler
+from summary_cache import SummaryCache, cached_generation, stream_cached_generation
+
+fetch_flight = SingleFlight('fetch')
+
+# Hedged extraction: race the next extractor if the current one is slow
+HEDGED_EXTRACTION = os.getenv("HEDGED_EXTRACTION", "0") == "1"
+HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", "1.5"))
+HEDGE_MIN_WORDS = int(os.getenv("HEDGE_MIN_WORDS", "50"))
+
+# Bump when the website summary prompt changes so cached summaries are not reused
+WEBSITE_SUMMARY_PROMPT_VERSION = 'website-v1'
+WEBSITE_SUMMARY_MAX_TOKENS = 120
 
 def call_gemini_ai(prompt, max_tokens=300):
     """
     Calls Gemini AI (Google Generative AI) to summarize content.
     You must have the `google-generativeai` package installed and your API key set as GEMINI_API_KEY.
+    The shared provider in llm_client is configured only once; llm_scheduler retries rate-limit errors.
     """
-    import google.generativeai as genai
-    import os
-
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise Exception("GEMINI_API_KEY environment variable is not set")
-
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-1.5-flash')
-
-    response = model.generate_content(
-        prompt,
-        generation_config=genai.types.GenerationConfig(
-            max_output_tokens=max_tokens,
-            temperature=0.7,
-        )
-    )
-    return response.text.strip()
+    return get_llm_scheduler().generate(prompt, max_tokens=max_tokens)
 
 
 
@@ -84,14 +97,22 @@ def detect_urls_in_query(query):
     return found_urls
 
 
-def fetch_website_content(url):
-    print(f"🌐 Fetching content from: {url}")
+def extract_with_newspaper(url, cancel_event=None):
+    """Download and parse an article with newspaper3k; returns None if too little content.
 
-    # Try newspaper3k first
+    Setting `cancel_event` stops the download (and skips the parse) of a hedged attempt that lost.
+    """
     try:
-        article = Article(url)
-        article.download()
-        article.parse()
+        # Download through the shared keep-alive session (capped at PAGE_MAX_BYTES), then let newspaper3k parse it
+        with page_memory.lease(url) as lease:
+            response = fetch(url, max_bytes=PAGE_MAX_BYTES, memory=lease, cancel_event=cancel_event)
+            if cancel_event is not None and cancel_event.is_set():
+                raise FetchCancelled(url)
+            article = Article(url)
+            # Without an HTTP charset hand over the raw bytes, so newspaper3k sniffs <meta charset>
+            # instead of us decoding a Latin-1/Shift_JIS page as UTF-8
+            article.download(input_html=response.text if response.encoding else response.content)
+            article.parse()
         text = article.text
         title = article.title or ""
         if text and len(text.split()) > 50:
@@ -105,435 +126,389 @@ def fetch_website_content(url):
             }
         else:
             print("⚠️ newspaper3k returned too little content, falling back to Selenium...")
+    except FetchCancelled:
+        print(f"🛑 newspaper3k download of {url} cancelled")
     except Exception as e:
         print(f"❌ Error extracting with newspaper3k: {e}")
         print("⚠️ Falling back to Selenium + BeautifulSoup...")
-        # === ADD DEBUG HERE ===
-    import time
-    print("DEBUG: time =", time)
-    print("DEBUG: time.sleep =", getattr(time, 'sleep', '❌ NOT FOUND'))
-    # ======================
+    return None
 
-    # Fallback: Selenium + BeautifulSoup (your existing code)
+
+def extract_with_streaming(url, cancel_event=None):
+    """Stream the page through an incremental parser and stop downloading once enough text is collected
+    (or as soon as `cancel_event` is set)"""
     try:
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        driver = webdriver.Chrome(options=chrome_options)
-
-        print("🚗 ChromeDriver started, loading URL...")
+        with page_memory.lease(url) as lease, \
+                stream(url, max_bytes=PAGE_MAX_BYTES, memory=lease, cancel_event=cancel_event) as (response, chunks):
+            title, clean_text, consumed = extract_main_text_streaming(chunks, encoding=response_encoding(response))
+        if len(clean_text.split()) <= 50:
+            print("⚠️ Streaming extraction returned too little content")
+            return None
+
+        # Limit content length for summarization
+        if len(clean_text) > 3000:
+            clean_text = clean_text[:3000] + "..."
+
+        print(f"✅ Streamed content: {len(clean_text)} characters from {consumed} bytes")
+        return {
+            'title': title,
+            'content': clean_text,
+            'url': url,
+            'type': 'website',
+            'extracted_at': datetime.now().isoformat()
+        }
+    except FetchCancelled:
+        print(f"🛑 Streaming download of {url} cancelled")
+        return None
+    except Exception as e:
+        print(f"❌ Error streaming {url}: {e}")
+        return None
+
+
+# Serializes the DOM in the browser and only ships the first `cap` characters to Python
+_CAPPED_PAGE_SOURCE_JS = (
+    "var html = document.documentElement.outerHTML;"
+    "return html.length > arguments[0] ? html.slice(0, arguments[0]) : null;"
+)
+
+
+def render_with_selenium(url, cancel_event=None, memory=None):
+    """Load a page in a pooled headless Chrome driver; returns (rendered HTML, page wait report).
+
+    Setting `cancel_event` (a threading.Event) stops a hedged render early and returns the
+    driver to the pool; the result is then discarded by the caller. Page sources longer than
+    PAGE_MAX_BYTES characters are cut in the browser, and the HTML kept is charged to
+    `memory` (a page_budget.PageLease) when given.
+    """
+    with get_driver_pool().driver() as driver:
+        if cancel_event is not None and cancel_event.is_set():
+            return None, None
+        print("🚗 Pooled ChromeDriver checked out, loading URL...")
         driver.get(url)
-        time.sleep(3)
+        wait_report = wait_for_page(driver, url, cancel_event=cancel_event)
+        if cancel_event is not None and cancel_event.is_set():
+            # The hedged race is over and the caller's lease may already be closed
+            return None, None
         print("✅ Page loaded, extracting HTML...")
-        html = driver.page_source
-        driver.quit()
-        print("✅ HTML extracted, parsing with BeautifulSoup...")
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # Check for YouTube
-        is_youtube = 'youtube.com/watch' in url or 'youtu.be/' in url
-        if is_youtube:
+        cap = min(PAGE_MAX_BYTES, memory.remaining) if memory is not None else PAGE_MAX_BYTES
+        html = driver.execute_script(_CAPPED_PAGE_SOURCE_JS, cap)
+        if html is None:
+            html = driver.page_source
+        else:
+            print(f"✂️ Rendered page exceeds {cap} characters, truncating")
+        if memory is not None:
+            memory.charge(len(html))
+        return html, wait_report
+
+
+def parse_rendered_html(html, url):
+    """Parse rendered HTML with BeautifulSoup and run the matching extractor"""
+    print("✅ HTML extracted, parsing with BeautifulSoup...")
+
+    # Check for YouTube
+    if is_youtube_url(url):
+        data = extract_youtube_content_partial(html, url) if PARTIAL_PARSE else None
+        if data is None:
+            soup = make_soup(html, 'youtube')
             data = extract_youtube_content(soup, url)
-            print("DEBUG: YouTube extraction result:", data)
-            return data
+        print("DEBUG: YouTube extraction result:", data)
+        return data
+
+    # For non-YouTube websites, use general extraction
+    soup = make_soup(html, 'website')
+    return extract_general_website_content(soup, url)
 
-        # For non-YouTube websites, use general extraction
-        return extract_general_website_content(soup, url)
 
+def extract_with_selenium(url):
+    """Render the page in Chrome and extract it with BeautifulSoup"""
+    try:
+        with page_memory.lease(url) as lease:
+            html, wait_report = render_with_selenium(url, memory=lease)
+            data = parse_rendered_html(html, url)
+        if data:
+            data['page_wait'] = wait_report
+        return data
     except Exception as e:
         print(f"❌ Error fetching {url} with Selenium: {e}")
         return None
 
-def extract_youtube_content(soup, url):
-    """Extract detailed content from YouTube video pages with enhanced accuracy"""
-    print("🎥 Extracting YouTube video content...")
 
-    try:
-        # Extract video ID for potential transcript access
-        video_id = ""
-        if 'watch?v=' in url:
-            video_id = url.split('watch?v=')[1].split('&')[0]
-        elif 'youtu.be/' in url:
-            video_id = url.split('youtu.be/')[1].split('?')[0]
+# Extractor name -> (sync extractor, executor stage). Every extractor takes a URL and
+# returns a website_data dict, or None so the next one in the chain is tried.
+EXTRACTORS = {
+    'youtube_fast': (fetch_youtube_fast, 'fetch'),
+    'metadata': (extract_song_metadata, 'fetch'),
+    'newspaper': (extract_with_newspaper, 'fetch'),
+    'streaming': (extract_with_streaming, 'fetch'),
+    'selenium': (extract_with_selenium, 'browser'),
+}
+# Extractors that take a cancel_event and stop downloading when a hedged race is decided
+CANCELLABLE_EXTRACTORS = {'newspaper', 'streaming'}
 
-        # Extract video title with multiple fallbacks
-        title = ""
-        title_selectors = [
-            'meta[property="og:title"]',
-            'meta[name="title"]',
-            'title',
-            'h1.ytd-video-primary-info-renderer',
-            '[data-e2e="video-title"]',
-            'h1.ytd-watch-metadata',
-            '.ytd-video-primary-info-renderer h1'
-        ]
 
-        for selector in title_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    title = element.get('content', '').strip()
-                else:
-                    title = element.get_text().strip()
-                if title and len(title) > 5:
-                    break
+def default_extractor_chain(url):
+    """Static extractor order used until the strategy table has learned something better"""
+    if is_youtube_url(url):
+        # Watch pages carry everything in ytInitialPlayerResponse; newspaper3k never helps here
+        return ['youtube_fast', 'metadata', 'selenium']
+    if is_song_host(url):
+        # Song pages are too short for newspaper3k; oEmbed/meta tags are enough for the song prompt
+        return ['metadata', 'newspaper', 'selenium']
+    # Static pages newspaper3k rejects can often still be read without a browser
+    return ['newspaper', 'streaming', 'selenium']
 
-        # Clean YouTube title
-        if title:
-            title = title.replace(' - YouTube', '').strip()
-            title = re.sub(r'\s+', ' ', title)
-
-        # Extract video description with better selectors
-        description = ""
-        desc_selectors = [
-            'meta[property="og:description"]',
-            'meta[name="description"]',
-            '[data-e2e="video-desc"]',
-            '#description',
-            '.description',
-            '.ytd-video-secondary-info-renderer #description',
-            '.ytd-expandable-video-description-body-renderer',
-            'ytd-expandable-video-description-body-renderer'
-        ]
 
-        for selector in desc_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    description = element.get('content', '').strip()
-                else:
-                    description = element.get_text().strip()
-                if description and len(description) > 30:
-                    break
+def extractor_chain(url):
+    """Ordered extractor names to try for a URL, as learned per domain (or overridden)"""
+    chain = get_extractor_strategy().order(url, default_extractor_chain(url))
+    return [name for name in chain if name in EXTRACTORS]
 
-        # Extract channel name with better accuracy
-        channel = ""
-        channel_selectors = [
-            'meta[property="og:video:creator"]',
-            '.ytd-video-owner-renderer a',
-            '.ytd-channel-name a',
-            '#owner-name a',
-            '.yt-user-info a',
-            'link[itemprop="url"]'
-        ]
 
-        for selector in channel_selectors:
-            element = soup.select_one(selector)
-            if element:
-                if element.name == 'meta':
-                    channel = element.get('content', '').strip()
-                elif element.name == 'link':
-                    href = element.get('href', '')
-                    if '/channel/' in href or '/@' in href:
-                        channel = href.split('/')[-1].replace('@', '').strip()
-                else:
-                    channel = element.get_text().strip()
-                if channel and len(channel) > 2:
-                    break
+def _record_attempt(url, name, data, started):
+    get_extractor_strategy().record(url, name, bool(data), time.monotonic() - started)
 
-        # Extract video metadata from page content and JSON-LD
-        page_text = soup.get_text()
 
-        # Try to extract structured data (JSON-LD)
-        json_scripts = soup.find_all('script', type='application/ld+json')
-        video_metadata = {}
+def _should_fail_fast(url):
+    """Skip fetching URLs that just failed and domains whose circuit is open"""
+    if negative_cache.contains(canonicalize_url(url)):
+        print(f"🚫 Skipping {url}: failed recently (negative cache)")
+        return True
+    if not circuit_breakers.allow(domain_of(url)):
+        print(f"🚫 Skipping {url}: circuit open for {domain_of(url)}")
+        return True
+    return False
 
-        for script in json_scripts:
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, list):
-                    data = data[0] if data else {}
 
-                if data.get('@type') == 'VideoObject':
-                    video_metadata = data
-                    break
-            except:
-                continue
+def _record_fetch_outcome(url, data):
+    circuit_breakers.record(domain_of(url), bool(data))
+    if not data:
+        negative_cache.add(canonicalize_url(url))
 
-        # Extract comprehensive video information
-        views = ""
-        view_patterns = [
-            r'([\d,\.]+)\s*views',
-            r'([\d,\.]+)\s*Views',
-            r'watched\s*([\d,\.]+)',
-            r'"viewCount":"(\d+)"',
-            r'"interactionCount":"(\d+)"'
-        ]
 
-        for pattern in view_patterns:
-            match = re.search(pattern, page_text, re.IGNORECASE)
-            if match:
-                views = match.group(1)
-                break
+def fetch_website_content(url):
+    cache = get_content_cache()
+    if cache:
+        cached = cache.get(url)
+        if cached:
+            print(f"⚡ Content cache hit for: {url}")
+            cached['extraction'] = {'mode': 'cache', 'winner': 'cache', 'elapsed_seconds': 0.0}
+            return cached
+
+    if _should_fail_fast(url):
+        return None
 
-        # Get view count from structured data
-        if not views and video_metadata.get('interactionStatistic'):
-            interaction = video_metadata['interactionStatistic']
-            if isinstance(interaction, list):
-                for stat in interaction:
-                    if stat.get('interactionType', {}).get('@type') == 'WatchAction':
-                        views = stat.get('userInteractionCount', '')
-                        break
-            elif isinstance(interaction, dict):
-                views = interaction.get('userInteractionCount', '')
-
-        # Extract duration with better patterns
-        duration = ""
-        duration_patterns = [
-            r'Duration:\s*(\d+:\d+(?::\d+)?)',
-            r'(\d+:\d+:\d+)',
-            r'(\d+:\d+)',
-            r'"lengthSeconds":"(\d+)"',
-            r'"duration":"PT(\d+)M(\d+)S"',
-            r'"duration":"PT(\d+)H(\d+)M(\d+)S"'
-        ]
+    data = annotate_song_language(_fetch_website_content_uncached(url))
+    _record_fetch_outcome(url, data)
+    if data and cache:
+        cache.set(url, data)
+    return data
 
-        for pattern in duration_patterns:
-            match = re.search(pattern, page_text)
-            if match:
-                if 'lengthSeconds' in pattern:
-                    seconds = int(match.group(1))
-                    minutes = seconds // 60
-                    remaining_seconds = seconds % 60
-                    if minutes >= 60:
-                        hours = minutes // 60
-                        minutes = minutes % 60
-                        duration = f"{hours}:{minutes:02d}:{remaining_seconds:02d}"
-                    else:
-                        duration = f"{minutes}:{remaining_seconds:02d}"
-                elif 'PT' in pattern and 'H' in pattern:
-                    hours, minutes, seconds = match.groups()
-                    duration = f"{hours}:{minutes.zfill(2)}:{seconds.zfill(2)}"
-                elif 'PT' in pattern:
-                    minutes, seconds = match.groups()
-                    duration = f"{minutes}:{seconds.zfill(2)}"
-                else:
-                    duration = match.group(1)
-                break
 
-        # Get duration from structured data
-        if not duration and video_metadata.get('duration'):
-            duration_iso = video_metadata['duration']
-            # Parse ISO 8601 duration (PT1H30M45S format)
-            duration_match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration_iso)
-            if duration_match:
-                hours, minutes, seconds = duration_match.groups()
-                hours = int(hours) if hours else 0
-                minutes = int(minutes) if minutes else 0
-                seconds = int(seconds) if seconds else 0
-
-                if hours > 0:
-                    duration = f"{hours}:{minutes:02d}:{seconds:02d}"
-                else:
-                    duration = f"{minutes}:{seconds:02d}"
+def _fetch_website_content_uncached(url):
+    print(f"🌐 Fetching content from: {url}")
 
-        # Extract keywords/tags with better coverage
-        keywords = ""
-        keywords_sources = [
-            soup.find('meta', {'name': 'keywords'}),
-            video_metadata.get('keywords', [])
-        ]
+    started = time.monotonic()
+    for name in extractor_chain(url):
+        extractor, _ = EXTRACTORS[name]
+        attempt_started = time.monotonic()
+        data = extractor(url)
+        _record_attempt(url, name, data, attempt_started)
+        if data:
+            data['extraction'] = {'mode': 'sequential', 'winner': name,
+                                  'elapsed_seconds': round(time.monotonic() - started, 3)}
+            return data
+    return None
 
-        all_keywords = []
-        for source in keywords_sources:
-            if isinstance(source, str):
-                all_keywords.extend([k.strip() for k in source.split(',') if k.strip()])
-            elif hasattr(source, 'get'):
-                content = source.get('content', '')
-                all_keywords.extend([k.strip() for k in content.split(',') if k.strip()])
-            elif isinstance(source, list):
-                all_keywords.extend(source)
-
-        if all_keywords:
-            keywords = ', '.join(all_keywords[:10])  # Limit to 10 keywords
-
-        # Extract upload date
-        upload_date = ""
-        if video_metadata.get('uploadDate'):
-            upload_date = video_metadata['uploadDate']
-        else:
-            date_patterns = [
-                r'"publishDate":"([^"]+)"',
-                r'"datePublished":"([^"]+)"'
-            ]
-            for pattern in date_patterns:
-                match = re.search(pattern, page_text)
-                if match:
-                    upload_date = match.group(1)
+
+async def _run_extractor_async(name, url, cancel_event=None):
+    """Run one extractor off the event loop on its stage executor"""
+    if name == 'selenium':
+        # Render on the browser pool, parse on the parse pool so drivers are freed early
+        try:
+            with page_memory.lease(url) as lease:
+                html, wait_report = await run_blocking('browser', render_with_selenium, url, cancel_event, lease)
+                if html is None:
+                    return None
+                data = await run_blocking('parse', parse_rendered_html, html, url)
+            if data:
+                data['page_wait'] = wait_report
+            return data
+        except Exception as e:
+            print(f"❌ Error fetching {url} with Selenium: {e}")
+            return None
+    extractor, stage = EXTRACTORS[name]
+    args = (url, cancel_event) if name in CANCELLABLE_EXTRACTORS else (url,)
+    try:
+        return await run_blocking(stage, extractor, *args)
+    except Exception as e:
+        print(f"❌ Extractor {name} failed for {url}: {e}")
+        return None
+
+
+def meets_quality_bar(data):
+    """True if an extraction result is good enough to win a hedged race"""
+    if not data:
+        return False
+    content = data.get('content', '')
+    if data.get('type') in ('youtube_video', 'song_metadata'):
+        # Song/video results are short by nature; a title plus some content is enough
+        return bool(data.get('title')) and bool(content)
+    return len(content.split()) > HEDGE_MIN_WORDS
+
+
+async def fetch_website_content_async(url):
+    """Async variant of fetch_website_content: every blocking stage runs on its own bounded executor"""
+    cache = get_content_cache()
+    if cache:
+        cached = cache.get(url)
+        if cached:
+            print(f"⚡ Content cache hit for: {url}")
+            cached['extraction'] = {'mode': 'cache', 'winner': 'cache', 'elapsed_seconds': 0.0}
+            return cached
+
+    if _should_fail_fast(url):
+        return None
+
+    async def fetch_and_cache():
+        data = annotate_song_language(await _fetch_website_content_uncached_async(url))
+        _record_fetch_outcome(url, data)
+        if data and cache:
+            cache.set(url, data)
+        return data
+
+    # Concurrent requests for the same page share a single fetch
+    return await fetch_flight.do(canonicalize_url(url), fetch_and_cache)
+
+
+async def _fetch_website_content_uncached_async(url):
+    print(f"🌐 Fetching content from: {url}")
+    chain = extractor_chain(url)
+    if HEDGED_EXTRACTION and len(chain) > 1:
+        return await _fetch_hedged_async(url, chain)
+
+    started = time.monotonic()
+    for name in chain:
+        attempt_started = time.monotonic()
+        data = await _run_extractor_async(name, url)
+        _record_attempt(url, name, data, attempt_started)
+        if data:
+            data['extraction'] = {'mode': 'sequential', 'winner': name,
+                                  'elapsed_seconds': round(time.monotonic() - started, 3)}
+            return data
+    return None
+
+
+async def _fetch_hedged_async(url, chain):
+    """Race the extractor chain: if the running extractor has no usable result within
+    HEDGE_DELAY, start the next one alongside it. The first result that meets the quality
+    bar wins and the rest are cancelled."""
+    started = time.monotonic()
+    cancel_event = threading.Event()
+    pending = {}  # task -> (extractor name, start time)
+    fallbacks = {}  # extractor name -> below-the-bar result, used if nothing wins
+    next_index = 0
+
+    def launch_next():
+        nonlocal next_index
+        name = chain[next_index]
+        next_index += 1
+        task = asyncio.ensure_future(_run_extractor_async(name, url, cancel_event))
+        pending[task] = (name, time.monotonic())
+        print(f"🏁 Hedged extraction: started {name}")
+
+    launch_next()
+    winner = None
+    try:
+        while pending:
+            timeout = HEDGE_DELAY if next_index < len(chain) else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # The running extractors are too slow: hedge with the next one
+                launch_next()
+                continue
+            for task in done:
+                name, attempt_started = pending.pop(task)
+                data = task.result()
+                _record_attempt(url, name, data, attempt_started)
+                if meets_quality_bar(data):
+                    winner = (name, data)
                     break
+                if data:
+                    fallbacks[name] = data
+            if winner:
+                break
+            if next_index < len(chain):
+                # Something finished without a usable result; don't wait for the hedge delay
+                launch_next()
+    finally:
+        cancel_event.set()
+        for task in pending:
+            task.cancel()
+
+    if winner is None:
+        for name in chain:
+            if name in fallbacks:
+                winner = (name, fallbacks[name])
+                break
+    if winner is None:
+        return None
 
-        # Try to extract video captions/transcript content from page
-        transcript_content = ""
-
-        # Look for transcript in page scripts
-        script_tags = soup.find_all('script')
-        for script in script_tags:
-            if script.string and 'captions' in script.string.lower():
-                # Try to extract caption data
-                caption_matches = re.findall(r'"text":"([^"]+)"', script.string)
-                if caption_matches:
-                    # Clean and join captions
-                    clean_captions = []
-                    for caption in caption_matches[:50]:  # Limit to first 50 captions
-                        caption = caption.replace('\\n', ' ').replace('\\', '').strip()
-                        if len(caption) > 5 and not caption.startswith(('[', '{')):
-                            clean_captions.append(caption)
-
-                    if clean_captions:
-                        transcript_content = ' '.join(clean_captions)
-                        break
-
-        # Analyze comments for additional context (limited)
-        comments_content = ""
-        comment_elements = soup.find_all(class_=re.compile(r'comment.*content'))
-        if comment_elements:
-            comment_texts = []
-            for elem in comment_elements[:5]:  # First 5 comments only
-                comment_text = elem.get_text().strip()
-                if len(comment_text) > 20 and len(comment_text) < 200:
-                    comment_texts.append(comment_text)
-
-            if comment_texts:
-                comments_content = ' | '.join(comment_texts)
-
-        # Build comprehensive content structure
-        content_parts = []
-
-        if title:
-            content_parts.append(f"Title: {title}")
-
-        if channel:
-            content_parts.append(f"Channel: {channel}")
-          # Video statistics
-        stats = []
-        if duration:
-            stats.append(f"Duration: {duration}")
-        if views:
-            stats.append(f"Views: {views}")
-        if upload_date:
-            try:
-                date_obj = datetime.fromisoformat(upload_date.replace('Z', '+00:00'))
-                formatted_date = date_obj.strftime('%Y-%m-%d')
-                stats.append(f"Published: {formatted_date}")
-            except:
-                stats.append(f"Published: {upload_date}")
-
-        if stats:
-            content_parts.append(f"Video Details: {' | '.join(stats)}")
-
-        if keywords:
-            content_parts.append(f"Topics/Tags: {keywords}")
-
-        # Enhanced description processing
-        if description:
-            # Extract meaningful content from description
-            desc_lines = description.split('\n')
-            content_lines = []
-            links = []
-
-            for line in desc_lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # Extract links
-                if line.startswith('http') or 'http' in line:
-                    url_matches = re.findall(r'https?://[^\s]+', line)
-                    links.extend(url_matches)
-                    # Remove URLs from description text
-                    line = re.sub(r'https?://[^\s]+', '', line).strip()
-
-                # Keep meaningful content
-                if (len(line) > 15 and
-                    not line.lower().startswith(('subscribe', 'follow', 'like', 'comment', 'share', 'download', 'visit', 'check out')) and
-                    not re.match(r'^[#@]', line) and
-                    not line.startswith('►')):
-                    content_lines.append(line)
-
-            # Build enhanced description
-            enhanced_desc_parts = []
-
-            if content_lines:
-                main_desc = ' '.join(content_lines[:8])  # First 8 meaningful lines
-                if len(main_desc) > 800:
-                    main_desc = main_desc[:800] + "..."
-                enhanced_desc_parts.append(f"Description: {main_desc}")
-
-            if links:
-                enhanced_desc_parts.append(f"Referenced Links: {len(links)} links mentioned")
-
-            if enhanced_desc_parts:
-                content_parts.extend(enhanced_desc_parts)
-
-        # Add transcript if available
-        if transcript_content:
-            if len(transcript_content) > 1000:
-                transcript_content = transcript_content[:1000] + "..."
-            content_parts.append(f"Video Content Sample: {transcript_content}")
-          # Add comment insights if available
-        if comments_content:
-            content_parts.append(f"Viewer Comments Sample: {comments_content}")
-
-        final_content = '. '.join(content_parts)
-
-        print(f"✅ YouTube content extracted: {len(final_content)} characters")
-        print(f"📋 Title: {title[:50]}..." if title else "📋 Title: Not found")
-        print(f"📋 Channel: {channel}" if channel else "📋 Channel: Not found")
-        print(f"📋 Description length: {len(description) if description else 0}")
-        print(f"📋 Transcript found: {len(transcript_content) > 0}")
-        print(f"📋 Video ID: {video_id}" if video_id else "📋 Video ID: Not extracted")
+    name, data = winner
+    elapsed = time.monotonic() - started
+    cancelled = [pending_name for pending_name, _ in pending.values()]
+    print(f"🏆 Hedged extraction won by {name} in {elapsed:.2f}s (cancelled: {cancelled or 'none'})")
+    data['extraction'] = {'mode': 'hedged', 'winner': name, 'elapsed_seconds': round(elapsed, 3),
+                          'started': chain[:next_index], 'cancelled': cancelled}
+    return data
 
-        return {
-            'title': title or 'YouTube Video',
-            'content': final_content,
-            'url': url,
-            'type': 'youtube_video',
-            'channel': channel,
-            'description': description[:800] if description else '',
-            'video_id': video_id,
-            'duration': duration,
-            'views': views,
-            'upload_date': upload_date,
-            'keywords': keywords,
-            'transcript_sample': transcript_content[:500] if transcript_content else '',
-            'extracted_at': datetime.now().isoformat()
-        }
+def extract_youtube_content(soup, url):
+    """Extract detailed content from YouTube video pages with enhanced accuracy"""
+    print("🎥 Extracting YouTube video content...")
+
+    try:
+        # Extract video ID for potential transcript access
+        video_id = extract_video_id(url)
+        fields = collect_youtube_fields(soup)
+        return build_youtube_video_data(url, video_id, **fields)
     except Exception as e:
         print(f"❌ Error extracting YouTube content: {e}")
         import traceback
         traceback.print_exc()
         return None
-    
-def extract_general_website_content(soup, url):
-    """Extract content from general websites with robust fallbacks and better paragraph structure"""
-    print("🌐 Extracting general website content...")
 
+
+def extract_youtube_content_partial(html, url):
+    """Head-only YouTube extraction for rendered pages.
+
+    Only <head> metadata and JSON-LD scripts are parsed; fields that live in the body
+    (views, duration, channel) are taken from the embedded player response instead.
+    Returns None when the head lacks a title or description so the caller can do a full parse.
+    """
+    print("🎥 Extracting YouTube video content (partial parse)...")
     try:
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'advertisement']):
-            element.decompose()
-
-        # Try to extract main content from common containers
-        main_content = None
-        content_selectors = [
-            'article', 'main', '[role="main"]', '.content', '.main-content',
-            '.post-content', '.entry-content', '.article-content', '.story-body',
-            '#content', '#main-content', '.container', '#mw-content-text'
-        ]
+        fields = collect_youtube_fields(make_partial_soup(html, 'youtube'))
+        if not fields['title'] or not fields['description']:
+            return None
+        player_response = extract_player_response(html)
+        player_fields = youtube_fields_from_player_response(player_response) if player_response else None
+        for key, value in (player_fields or {}).items():
+            if value and not fields.get(key):
+                fields[key] = value
+        video_id = extract_video_id(url)
+        fields['transcript_content'] = get_transcript(player_response, video_id)
+        return build_youtube_video_data(url, video_id, **fields)
+    except Exception as e:
+        print(f"⚠️ Partial YouTube extraction failed, doing a full parse: {e}")
+        return None
 
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                main_content = elements[0]
-                break
 
-        # If no specific content container found, use body
-        if not main_content:
-            main_content = soup.find('body')
+def extract_general_website_content(soup, url):
+    """Extract content from general websites with robust fallbacks and better paragraph structure"""
+    print("🌐 Extracting general website content...")
 
+    try:
+        # Pick the main content container (script/nav/header/footer/aside subtrees are skipped)
+        main_content = find_main_container(soup) or soup.find('body')
         if not main_content:
             return None
 
@@ -543,28 +518,21 @@ def extract_general_website_content(soup, url):
         if title_tag:
             title = title_tag.get_text().strip()
 
-        # Try to extract all <p> tags as paragraphs (best for most sites)
-        paragraphs = [p.get_text(" ", strip=True) for p in main_content.find_all('p') if len(p.get_text(strip=True)) > 30]
-        clean_text = '\n\n'.join(paragraphs)
-
-        # Fallback: If still too short, try <div> and <span> tags
-        if len(clean_text) < 100:
-            divs = [d.get_text(" ", strip=True) for d in main_content.find_all('div') if len(d.get_text(strip=True)) > 40]
-            spans = [s.get_text(" ", strip=True) for s in main_content.find_all('span') if len(s.get_text(strip=True)) > 40]
-            all_blocks = paragraphs + divs + spans
-            clean_text = '\n\n'.join(all_blocks)
-
-        # Fallback: If still too short, get all visible text from <body>
-        if len(clean_text) < 100:
-            body = soup.find('body')
-            if body:
-                text = body.get_text(separator='\n\n', strip=True)
-                if len(text) > len(clean_text):
-                    clean_text = text
-
-        # Final fallback: get all text from soup
-        if len(clean_text) < 100:
-            text = soup.get_text(separator='\n\n', strip=True)
+        # Text-density pass: dense, low-link blocks only, stopping once the budget is filled
+        clean_text = extract_main_text(main_content)
+
+        # Fallback: If still too short, score the whole body
+        body = soup.find('body')
+        if len(clean_text) < 100 and body and body is not main_content:
+            text = extract_main_text(body)
+            if len(text) > len(clean_text):
+                clean_text = text
+
+        # Fallback: If still too short, keep every visible block of the body, then of the whole document
+        for root in (body, soup):
+            if len(clean_text) >= 100 or root is None:
+                continue
+            text = extract_main_text(root, min_chars=0, max_link_density=1.0)
             if len(text) > len(clean_text):
                 clean_text = text
 
@@ -588,27 +556,22 @@ def extract_general_website_content(soup, url):
 
 
 
-def create_website_summary_response(query, website_data, bot_id=None):
-    """Create a concise, persona-based summary of website content using AI"""
-    print(f"📝 Creating AI-powered website summary response...")
-
+def _website_summary_prompt(website_data, bot_id=None):
+    """Gemini prompt for a website summary, or (None, message) when there is nothing to summarize"""
     if not website_data:
-        return f"I was unable to fetch content from the website you provided. Please check the URL and try again."
+        return None, f"I was unable to fetch content from the website you provided. Please check the URL and try again."
 
     title = website_data.get('title', 'Untitled')
     content = website_data.get('content', '')
-    url = website_data.get('url', '')
-    content_type = website_data.get('type', 'website')
 
     print(f"[DEBUG] Extracted content length: {len(content)}")
     print(f"[DEBUG] Extracted content preview: {content[:200]}")
 
     if not content or len(content) < 50:
-        return f"I was able to access the website '{title}' but couldn't extract enough readable content to provide a summary."
+        return None, f"I was able to access the website '{title}' but couldn't extract enough readable content to provide a summary."
 
     # --- Fetch bot prompt and traits ---
     bot_prompt = ""
-    traits = ""
     if bot_id:
         try:
             bot_prompt = get_bot_prompt(bot_id)
@@ -623,8 +586,11 @@ def create_website_summary_response(query, website_data, bot_id=None):
         f"Do not cut off sentences in the middle. Focus on the main topics and key details. "
         f"Here is the content:\n\n{content[:1500]}"
     )
+    return ai_prompt, None
+
 
-    summary_text = call_gemini_ai(ai_prompt, max_tokens=120)
+def _finish_website_summary(summary_text, website_data):
+    title = website_data.get('title', 'Untitled')
     # Ensure summary is not cut in the middle of a sentence
     if summary_text and isinstance(summary_text, str):
         # Optionally, trim to the last full sentence if needed
@@ -637,6 +603,51 @@ def create_website_summary_response(query, website_data, bot_id=None):
 
     return summary_text.strip().replace(",,", ",").replace(" ,", ",").replace(" .", ".")
 
+
+def create_website_summary_response(query, website_data, bot_id=None):
+    """Create a concise, persona-based summary of website content using AI"""
+    print(f"📝 Creating AI-powered website summary response...")
+    ai_prompt, message = _website_summary_prompt(website_data, bot_id)
+    if ai_prompt is None:
+        return message
+    return _finish_website_summary(call_gemini_ai(ai_prompt, max_tokens=WEBSITE_SUMMARY_MAX_TOKENS), website_data)
+
+async def create_website_summary_response_async(query, website_data, bot_id=None):
+    """Async variant of create_website_summary_response; awaits the shared Gemini client, results go through the summary cache"""
+    print(f"📝 Creating AI-powered website summary response...")
+    ai_prompt, message = _website_summary_prompt(website_data, bot_id)
+    if ai_prompt is None:
+        return message
+
+    async def generate():
+        summary_text = await get_llm_scheduler().generate_async(ai_prompt, max_tokens=WEBSITE_SUMMARY_MAX_TOKENS)
+        return _finish_website_summary(summary_text, website_data)
+
+    # Same persona + same content + same prompt template: reuse the earlier generation
+    key = SummaryCache.key(bot_id or '', 'website', WEBSITE_SUMMARY_PROMPT_VERSION, WEBSITE_SUMMARY_MAX_TOKENS,
+                           website_data.get('content', '')[:1500])
+    return await cached_generation(key, generate)
+
+async def stream_website_summary_async(query, website_data, bot_id=None):
+    """Streaming variant of create_website_summary_response_async.
+
+    Yields ('token', text) chunks as Gemini produces them, then ('final', summary) with the
+    same text the non-streaming variant returns.
+    """
+    ai_prompt, message = _website_summary_prompt(website_data, bot_id)
+    if ai_prompt is None:
+        yield 'token', message
+        yield 'final', message
+        return
+    key = SummaryCache.key(bot_id or '', 'website', WEBSITE_SUMMARY_PROMPT_VERSION, WEBSITE_SUMMARY_MAX_TOKENS,
+                           website_data.get('content', '')[:1500])
+    async for event in stream_cached_generation(
+        key,
+        lambda: get_llm_scheduler().stream_async(ai_prompt, max_tokens=WEBSITE_SUMMARY_MAX_TOKENS),
+        finish=lambda text: _finish_website_summary(text, website_data),
+    ):
+        yield event
+
 def create_structured_website_fallback(query, website_data, bot_id=None):
     import re
     from datetime import datetime
@@ -0,0 +1,572 @@
+import re
+import os
+import json
+import time
+import functools
+from datetime import datetime
+from http_client import fetch
+from page_budget import page_memory, PAGE_MAX_BYTES
+from transcripts import get_transcript
+
+YOUTUBE_FAST_TIMEOUT = float(os.getenv("YOUTUBE_FAST_TIMEOUT", "5"))
+
+# The CONSENT cookie skips the EU consent interstitial on plain-HTTP watch page requests
+YOUTUBE_REQUEST_HEADERS = {'Cookie': 'CONSENT=YES+1'}
+
+_PLAYER_RESPONSE_MARKERS = (
+    'var ytInitialPlayerResponse = ',
+    'ytInitialPlayerResponse = ',
+    'window["ytInitialPlayerResponse"] = ',
+)
+
+
+def is_youtube_url(url):
+    return 'youtube.com/watch' in url or 'youtu.be/' in url
+
+
+def extract_video_id(url):
+    """Extract the video id from a watch or youtu.be URL"""
+    if 'watch?v=' in url:
+        return url.split('watch?v=')[1].split('&')[0]
+    elif 'youtu.be/' in url:
+        return url.split('youtu.be/')[1].split('?')[0]
+    return ""
+
+
+def format_duration(total_seconds):
+    """Format a number of seconds as m:ss or h:mm:ss"""
+    seconds = int(total_seconds)
+    minutes = seconds // 60
+    remaining_seconds = seconds % 60
+    if minutes >= 60:
+        hours = minutes // 60
+        minutes = minutes % 60
+        return f"{hours}:{minutes:02d}:{remaining_seconds:02d}"
+    return f"{minutes}:{remaining_seconds:02d}"
+
+
+def extract_player_response(html):
+    """Pull the ytInitialPlayerResponse JSON out of raw watch-page HTML.
+
+    Accepts str or bytes; only the slice holding that one blob is decoded and parsed.
+    Returns the decoded dict, or None when the page doesn't carry it.
+    """
+    is_bytes = isinstance(html, bytes)
+    for marker in _PLAYER_RESPONSE_MARKERS:
+        if is_bytes:
+            marker = marker.encode('ascii')
+        start = html.find(marker)
+        if start == -1:
+            continue
+        start = html.find(b'{' if is_bytes else '{', start + len(marker))
+        if start == -1:
+            continue
+        end = html.find(b'</script>' if is_bytes else '</script>', start)
+        blob = html[start:end if end != -1 else len(html)]
+        if is_bytes:
+            blob = blob.decode('utf-8', errors='replace')
+        try:
+            data, _ = json.JSONDecoder().raw_decode(blob)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def youtube_fields_from_player_response(player_response):
+    """Map ytInitialPlayerResponse onto the fields used by the youtube_video dict"""
+    details = player_response.get('videoDetails') or {}
+    microformat = (player_response.get('microformat') or {}).get('playerMicroformatRenderer') or {}
+    if not details.get('title'):
+        return None
+
+    length = details.get('lengthSeconds') or microformat.get('lengthSeconds')
+    keywords = details.get('keywords') or []
+    return {
+        'title': details.get('title', ''),
+        'channel': details.get('author', '') or microformat.get('ownerChannelName', ''),
+        'description': details.get('shortDescription', '')
+                       or (microformat.get('description') or {}).get('simpleText', ''),
+        'duration': format_duration(length) if length and str(length).isdigit() else '',
+        'views': details.get('viewCount', '') or microformat.get('viewCount', ''),
+        'upload_date': microformat.get('publishDate', '') or microformat.get('uploadDate', ''),
+        'keywords': ', '.join(keywords[:10]),
+    }
+
+
+def build_youtube_video_data(url, video_id, title, channel='', description='', duration='', views='',
+                             upload_date='', keywords='', transcript_content='', comments_content=''):
+    """Assemble the `youtube_video` website_data dict from extracted fields"""
+    content_parts = []
+
+    if title:
+        content_parts.append(f"Title: {title}")
+
+    if channel:
+        content_parts.append(f"Channel: {channel}")
+    # Video statistics
+    stats = []
+    if duration:
+        stats.append(f"Duration: {duration}")
+    if views:
+        stats.append(f"Views: {views}")
+    if upload_date:
+        try:
+            date_obj = datetime.fromisoformat(upload_date.replace('Z', '+00:00'))
+            formatted_date = date_obj.strftime('%Y-%m-%d')
+            stats.append(f"Published: {formatted_date}")
+        except:
+            stats.append(f"Published: {upload_date}")
+
+    if stats:
+        content_parts.append(f"Video Details: {' | '.join(stats)}")
+
+    if keywords:
+        content_parts.append(f"Topics/Tags: {keywords}")
+
+    # Enhanced description processing
+    if description:
+        # Extract meaningful content from description
+        desc_lines = description.split('\n')
+        content_lines = []
+        links = []
+
+        for line in desc_lines:
+            line = line.strip()
+            if not line:
+                continue
+
+            # Extract links
+            if line.startswith('http') or 'http' in line:
+                url_matches = re.findall(r'https?://[^\s]+', line)
+                links.extend(url_matches)
+                # Remove URLs from description text
+                line = re.sub(r'https?://[^\s]+', '', line).strip()
+
+            # Keep meaningful content
+            if (len(line) > 15 and
+                not line.lower().startswith(('subscribe', 'follow', 'like', 'comment', 'share', 'download', 'visit', 'check out')) and
+                not re.match(r'^[#@]', line) and
+                not line.startswith('►')):
+                content_lines.append(line)
+
+        # Build enhanced description
+        enhanced_desc_parts = []
+
+        if content_lines:
+            main_desc = ' '.join(content_lines[:8])  # First 8 meaningful lines
+            if len(main_desc) > 800:
+                main_desc = main_desc[:800] + "..."
+            enhanced_desc_parts.append(f"Description: {main_desc}")
+
+        if links:
+            enhanced_desc_parts.append(f"Referenced Links: {len(links)} links mentioned")
+
+        if enhanced_desc_parts:
+            content_parts.extend(enhanced_desc_parts)
+
+    # Add transcript if available
+    if transcript_content:
+        if len(transcript_content) > 1000:
+            transcript_content = transcript_content[:1000] + "..."
+        content_parts.append(f"Video Content Sample: {transcript_content}")
+    # Add comment insights if available
+    if comments_content:
+        content_parts.append(f"Viewer Comments Sample: {comments_content}")
+
+    final_content = '. '.join(content_parts)
+
+    print(f"✅ YouTube content extracted: {len(final_content)} characters")
+    print(f"📋 Title: {title[:50]}..." if title else "📋 Title: Not found")
+    print(f"📋 Channel: {channel}" if channel else "📋 Channel: Not found")
+    print(f"📋 Description length: {len(description) if description else 0}")
+    print(f"📋 Transcript found: {len(transcript_content) > 0}")
+    print(f"📋 Video ID: {video_id}" if video_id else "📋 Video ID: Not extracted")
+
+    return {
+        'title': title or 'YouTube Video',
+        'content': final_content,
+        'url': url,
+        'type': 'youtube_video',
+        'channel': channel,
+        'description': description[:800] if description else '',
+        'video_id': video_id,
+        'duration': duration,
+        'views': views,
+        'upload_date': upload_date,
+        'keywords': keywords,
+        'transcript_sample': transcript_content[:500] if transcript_content else '',
+        'extracted_at': datetime.now().isoformat()
+    }
+
+
+def fetch_youtube_fast(url):
+    """Browser-free YouTube extraction from the watch page's embedded player response.
+
+    Returns None when the page can't be downloaded or doesn't carry the JSON blob,
+    so the caller can fall back to Selenium.
+    """
+    video_id = extract_video_id(url)
+    watch_url = f"https://www.youtube.com/watch?v={video_id}" if video_id else url
+    print(f"⚡ Trying YouTube fast path for: {watch_url}")
+    try:
+        # Watch pages are ~1 MB+; hold them under the page memory budget until the JSON is out
+        with page_memory.lease(watch_url) as lease:
+            response = fetch(watch_url, headers=YOUTUBE_REQUEST_HEADERS, timeout=YOUTUBE_FAST_TIMEOUT,
+                             max_bytes=PAGE_MAX_BYTES, memory=lease)
+            player_response = extract_player_response(response.content)
+            del response
+    except Exception as e:
+        print(f"❌ YouTube fast path download failed: {e}")
+        return None
+
+    fields = youtube_fields_from_player_response(player_response) if player_response else None
+    if not fields:
+        print("⚠️ ytInitialPlayerResponse not found, falling back to Selenium...")
+        return None
+    fields['transcript_content'] = get_transcript(player_response, video_id)
+    return build_youtube_video_data(url, video_id, **fields)
+
+
+# --- Single-pass field collection for rendered watch pages ----------------------------
+
+YOUTUBE_EXTRACT_DEBUG = os.getenv("YOUTUBE_EXTRACT_DEBUG", "0") == "1"
+
+
+def _has_class(el, cls):
+    return cls in (el.get('class') or ())
+
+
+def _has_ancestor(el, predicate):
+    return any(predicate(parent) for parent in el.parents if parent.name)
+
+
+def _meta(attr, value):
+    return lambda el: el.name == 'meta' and el.get(attr) == value
+
+
+# Selector cascades in priority order, expressed as element predicates so every field
+# can be matched during one walk over the tree (same semantics as soup.select_one).
+_TITLE_MATCHERS = [
+    _meta('property', 'og:title'),                                             # meta[property="og:title"]
+    _meta('name', 'title'),                                                    # meta[name="title"]
+    lambda el: el.name == 'title',                                             # title
+    lambda el: el.name == 'h1' and _has_class(el, 'ytd-video-primary-info-renderer'),
+    lambda el: el.get('data-e2e') == 'video-title',
+    lambda el: el.name == 'h1' and _has_class(el, 'ytd-watch-metadata'),
+    lambda el: el.name == 'h1' and _has_ancestor(el, lambda p: _has_class(p, 'ytd-video-primary-info-renderer')),
+]
+_DESCRIPTION_MATCHERS = [
+    _meta('property', 'og:description'),                                       # meta[property="og:description"]
+    _meta('name', 'description'),                                              # meta[name="description"]
+    lambda el: el.get('data-e2e') == 'video-desc',
+    lambda el: el.get('id') == 'description',                                  # #description
+    lambda el: _has_class(el, 'description'),                                  # .description
+    lambda el: el.get('id') == 'description' and _has_ancestor(el, lambda p: _has_class(p, 'ytd-video-secondary-info-renderer')),
+    lambda el: _has_class(el, 'ytd-expandable-video-description-body-renderer'),
+    lambda el: el.name == 'ytd-expandable-video-description-body-renderer',
+]
+_CHANNEL_MATCHERS = [
+    _meta('property', 'og:video:creator'),                                     # meta[property="og:video:creator"]
+    lambda el: el.name == 'a' and _has_ancestor(el, lambda p: _has_class(p, 'ytd-video-owner-renderer')),
+    lambda el: el.name == 'a' and _has_ancestor(el, lambda p: _has_class(p, 'ytd-channel-name')),
+    lambda el: el.name == 'a' and _has_ancestor(el, lambda p: p.get('id') == 'owner-name'),
+    lambda el: el.name == 'a' and _has_ancestor(el, lambda p: _has_class(p, 'yt-user-info')),
+    lambda el: el.name == 'link' and el.get('itemprop') == 'url',              # link[itemprop="url"]
+]
+
+_COMMENT_CLASS = re.compile(r'comment.*content')
+
+# Text patterns per field in priority order: (pattern, flags)
+_TEXT_PATTERNS = {
+    'views': [
+        (r'([\d,\.]+)\s*views', re.IGNORECASE),
+        (r'([\d,\.]+)\s*Views', re.IGNORECASE),
+        (r'watched\s*([\d,\.]+)', re.IGNORECASE),
+        (r'"viewCount":"(\d+)"', re.IGNORECASE),
+        (r'"interactionCount":"(\d+)"', re.IGNORECASE),
+    ],
+    'duration': [
+        (r'Duration:\s*(\d+:\d+(?::\d+)?)', 0),
+        (r'(\d+:\d+:\d+)', 0),
+        (r'(\d+:\d+)', 0),
+        (r'"lengthSeconds":"(\d+)"', 0),
+        (r'"duration":"PT(\d+)M(\d+)S"', 0),
+        (r'"duration":"PT(\d+)H(\d+)M(\d+)S"', 0),
+    ],
+    'upload_date': [
+        (r'"publishDate":"([^"]+)"', 0),
+        (r'"datePublished":"([^"]+)"', 0),
+    ],
+}
+_COMPILED_TEXT_PATTERNS = {
+    field: [re.compile(pattern, flags) for pattern, flags in patterns]
+    for field, patterns in _TEXT_PATTERNS.items()
+}
+
+def _wrap_pattern(pattern, flags):
+    return f'(?i:{pattern})' if flags & re.IGNORECASE else f'(?:{pattern})'
+
+
+@functools.lru_cache(maxsize=None)
+def _text_scanner(limits):
+    """Zero-width scanner for the patterns that can still improve a field.
+
+    `limits` holds, per field, how many top-priority patterns are still worth looking for.
+    The scanner stops only where at least one of them matches (the leading class is the
+    union of the patterns' first characters, so other positions fail fast) and records
+    which pattern matched there per field in a named group.
+    """
+    wanted = [(field, patterns[:limit]) for (field, patterns), limit in zip(_TEXT_PATTERNS.items(), limits) if limit]
+    if not wanted:
+        return None
+    return re.compile(
+        r'(?=[\d,.wWdD"])'
+        + '(?=' + '|'.join(_wrap_pattern(p, f) for _, patterns in wanted for p, f in patterns) + ')'
+        + ''.join(
+            '(?:(?=' + '|'.join(f'(?P<{field}_{i}>{_wrap_pattern(p, f)})' for i, (p, f) in enumerate(patterns)) + ')|)'
+            for field, patterns in wanted
+        )
+    )
+
+
+def _scan_page_text(page_text):
+    """Find, per field, the highest-priority pattern that matches and its leftmost match,
+    in one forward pass over the text (equivalent to trying each pattern with re.search in
+    order). Whenever a field improves, scanning resumes with a narrower scanner."""
+    best = {field: (len(patterns), -1) for field, patterns in _TEXT_PATTERNS.items()}
+    position = 0
+    while True:
+        scanner = _text_scanner(tuple(priority for priority, _ in best.values()))
+        if scanner is None:
+            break
+        for candidate in scanner.finditer(page_text, position):
+            improved = False
+            for field, (priority, _) in best.items():
+                for index in range(priority):
+                    if candidate.start(f'{field}_{index}') != -1:
+                        best[field] = (index, candidate.start())
+                        improved = True
+                        break
+            if improved:
+                position = candidate.start() + 1
+                break
+        else:
+            break
+    return {
+        field: (priority, _COMPILED_TEXT_PATTERNS[field][priority].match(page_text, position))
+        for field, (priority, position) in best.items() if position != -1
+    }
+
+
+def _resolve_cascade(matches, extract, accept):
+    """Replay a selector cascade over the first match found for each selector"""
+    value = ""
+    for element in matches:
+        if element is None:
+            continue
+        value = extract(element, value)
+        if accept(value):
+            break
+    return value
+
+
+def _extract_text_or_meta(element, previous):
+    if element.name == 'meta':
+        return element.get('content', '').strip()
+    return element.get_text().strip()
+
+
+def _extract_channel(element, previous):
+    if element.name == 'meta':
+        return element.get('content', '').strip()
+    if element.name == 'link':
+        href = element.get('href', '')
+        if '/channel/' in href or '/@' in href:
+            return href.split('/')[-1].replace('@', '').strip()
+        return previous
+    return element.get_text().strip()
+
+
+def _comment_class_matches(classes):
+    if isinstance(classes, str):
+        return bool(_COMMENT_CLASS.search(classes))
+    return any(_COMMENT_CLASS.search(c) for c in classes) or bool(_COMMENT_CLASS.search(' '.join(classes)))
+
+
+def collect_youtube_fields(soup):
+    """Collect title, channel, description, stats, keywords, transcript and comments from a YouTube soup.
+
+    Every selector cascade, the JSON-LD/keyword/player-response/comment lookups are resolved from a
+    single walk over the tree, and the view/duration/date patterns from a single scan of the
+    page text. Set YOUTUBE_EXTRACT_DEBUG=1 to print a per-field timing breakdown.
+    """
+    timings = {}
+    clock = time.perf_counter()
+
+    def lap(name):
+        nonlocal clock
+        now = time.perf_counter()
+        timings[name] = now - clock
+        clock = now
+
+    cascades = {
+        'title': (_TITLE_MATCHERS, [None] * len(_TITLE_MATCHERS)),
+        'description': (_DESCRIPTION_MATCHERS, [None] * len(_DESCRIPTION_MATCHERS)),
+        'channel': (_CHANNEL_MATCHERS, [None] * len(_CHANNEL_MATCHERS)),
+    }
+    json_ld_scripts = []
+    player_script = None
+    keywords_meta = None
+    comment_elements = []
+
+    for element in soup.find_all(True):
+        for matchers, first_matches in cascades.values():
+            for index, matcher in enumerate(matchers):
+                if first_matches[index] is None and matcher(element):
+                    first_matches[index] = element
+        if element.name == 'script':
+            if element.get('type') == 'application/ld+json':
+                json_ld_scripts.append(element)
+            if player_script is None and element.string and 'ytInitialPlayerResponse' in element.string:
+                player_script = element
+        elif element.name == 'meta' and keywords_meta is None and element.get('name') == 'keywords':
+            keywords_meta = element
+        if len(comment_elements) < 5:
+            classes = element.get('class')
+            if classes and _comment_class_matches(classes):
+                comment_elements.append(element)
+    lap('traversal')
+
+    title = _resolve_cascade(cascades['title'][1], _extract_text_or_meta, lambda v: bool(v) and len(v) > 5)
+    # Clean YouTube title
+    if title:
+        title = title.replace(' - YouTube', '').strip()
+        title = re.sub(r'\s+', ' ', title)
+    lap('title')
+
+    description = _resolve_cascade(cascades['description'][1], _extract_text_or_meta, lambda v: bool(v) and len(v) > 30)
+    lap('description')
+
+    channel = _resolve_cascade(cascades['channel'][1], _extract_channel, lambda v: bool(v) and len(v) > 2)
+    lap('channel')
+
+    # Structured data (JSON-LD)
+    video_metadata = {}
+    for script in json_ld_scripts:
+        try:
+            data = json.loads(script.string)
+            if isinstance(data, list):
+                data = data[0] if data else {}
+
+            if data.get('@type') == 'VideoObject':
+                video_metadata = data
+                break
+        except:
+            continue
+    lap('json_ld')
+
+    page_text = soup.get_text()
+    lap('page_text')
+    text_matches = _scan_page_text(page_text)
+    lap('text_scan')
+
+    # Views: page text first, then structured data
+    views = ""
+    if 'views' in text_matches:
+        views = text_matches['views'][1].group(1)
+    if not views and video_metadata.get('interactionStatistic'):
+        interaction = video_metadata['interactionStatistic']
+        if isinstance(interaction, list):
+            for stat in interaction:
+                if stat.get('interactionType', {}).get('@type') == 'WatchAction':
+                    views = stat.get('userInteractionCount', '')
+                    break
+        elif isinstance(interaction, dict):
+            views = interaction.get('userInteractionCount', '')
+    lap('views')
+
+    # Duration: page text first, then structured data
+    duration = ""
+    if 'duration' in text_matches:
+        priority, match = text_matches['duration']
+        if priority == 3:  # "lengthSeconds"
+            duration = format_duration(match.group(1))
+        elif priority == 5:  # PT#H#M#S
+            hours, minutes, seconds = match.groups()
+            duration = f"{hours}:{minutes.zfill(2)}:{seconds.zfill(2)}"
+        elif priority == 4:  # PT#M#S
+            minutes, seconds = match.groups()
+            duration = f"{minutes}:{seconds.zfill(2)}"
+        else:
+            duration = match.group(1)
+    if not duration and video_metadata.get('duration'):
+        duration_iso = video_metadata['duration']
+        # Parse ISO 8601 duration (PT1H30M45S format)
+        duration_match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration_iso)
+        if duration_match:
+            hours, minutes, seconds = duration_match.groups()
+            hours = int(hours) if hours else 0
+            minutes = int(minutes) if minutes else 0
+            seconds = int(seconds) if seconds else 0
+
+            if hours > 0:
+                duration = f"{hours}:{minutes:02d}:{seconds:02d}"
+            else:
+                duration = f"{minutes}:{seconds:02d}"
+    lap('duration')
+
+    # Keywords/tags from the meta tag and structured data
+    all_keywords = []
+    for source in (keywords_meta, video_metadata.get('keywords', [])):
+        if isinstance(source, str):
+            all_keywords.extend([k.strip() for k in source.split(',') if k.strip()])
+        elif hasattr(source, 'get'):
+            content = source.get('content', '')
+            all_keywords.extend([k.strip() for k in content.split(',') if k.strip()])
+        elif isinstance(source, list):
+            all_keywords.extend(source)
+    keywords = ', '.join(all_keywords[:10]) if all_keywords else ""  # Limit to 10 keywords
+    lap('keywords')
+
+    # Upload date: structured data first, then page text
+    upload_date = ""
+    if video_metadata.get('uploadDate'):
+        upload_date = video_metadata['uploadDate']
+    elif 'upload_date' in text_matches:
+        upload_date = text_matches['upload_date'][1].group(1)
+    lap('upload_date')
+
+    # Transcript from the caption tracks listed in the embedded player response
+    transcript_content = ""
+    if player_script is not None:
+        transcript_content = get_transcript(extract_player_response(player_script.string))
+    lap('transcript')
+
+    # Comments for additional context (limited)
+    comments_content = ""
+    comment_texts = []
+    for elem in comment_elements:  # First 5 comments only
+        comment_text = elem.get_text().strip()
+        if len(comment_text) > 20 and len(comment_text) < 200:
+            comment_texts.append(comment_text)
+    if comment_texts:
+        comments_content = ' | '.join(comment_texts)
+    lap('comments')
+
+    if YOUTUBE_EXTRACT_DEBUG:
+        breakdown = ', '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings.items())
+        print(f"⏱️ YouTube field timings: {breakdown}")
+
+    return {
+        'title': title,
+        'channel': channel,
+        'description': description,
+        'duration': duration,
+        'views': views,
+        'upload_date': upload_date,
+        'keywords': keywords,
+        'transcript_content': transcript_content,
+        'comments_content': comments_content,
+    }